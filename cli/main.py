@@ -5,108 +5,96 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import typer
 from rich.console import Console
 from rich.prompt import Prompt
-from core.scraper import ComickScraper
-from core.downloader import Downloader
-from core.config import DEFAULT_OUTPUT_DIR
+from core.config import DEFAULT_OUTPUT_DIR, DAEMON_HOST, DAEMON_PORT, DAEMON_DB_PATH, WORK_QUEUE_PATH, WORKER_LEASE_SECONDS, SCRAPE_WORKERS, PACKAGE_WORKERS, PIPELINE_QUEUE_SIZE, DOWNLOAD_HTTP2, METADATA_FILENAME
 from utils.sanitizer import sanitize_filename
-import re
-import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import traceback
-from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn, TaskProgressColumn, MofNCompleteColumn
+from utils.selection import get_comic_slug, get_chapter_slug, is_chapter_url, parse_chapter_selection, parse_batch_file
+
+# The scraper (Playwright, cloudscraper, BeautifulSoup), the downloader (Pillow)
+# and the rest of core/ are imported inside the commands that use them, so
+# `--help` and quick commands start fast. tools/check_import_time.py guards this.
 
 app = typer.Typer()
 console = Console()
 
-def get_comic_slug(url: str) -> str:
-    """Extracts the comic slug from the URL for the output directory name."""
-    match = re.search(r'/comic/([^/]+)', url)
-    return match.group(1) if match else "manga"
+def _make_progress():
+    from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn, TaskProgressColumn, MofNCompleteColumn
+    return Progress(
+        TextColumn("[bold blue]{task.description}", justify="right"),
+        BarColumn(bar_width=None),
+        TaskProgressColumn(),
+        MofNCompleteColumn(),
+        "•",
+        TimeRemainingColumn(),
+        TextColumn("[dim]{task.fields[transfer]}"),
+        console=console # Use the shared console
+    )
 
-def parse_chapter_selection(selection: str, max_chapters: int) -> list[int]:
-    """Parses a chapter selection string (e.g., '1,3-5,all')."""
-    if selection.lower() == 'all':
-        return list(range(1, max_chapters + 1))
-    
-    indices = set()
-    parts = selection.split(',')
-    for part in parts:
-        part = part.strip()
-        if '-' in part:
-            start, end = map(int, part.split('-'))
-            indices.update(range(start, end + 1))
-        else:
-            indices.add(int(part))
-    return sorted(list(indices))
+def _track_transfer(progress, chapters_total: int):
+    """Adds a page-level task to a rich progress display, fed by a TransferProgress a few times a second."""
+    from core.progress import TransferProgress, format_transfer
+    pages_task = progress.add_task("[bold green]Pages", total=None, transfer="")
 
-def _download_single_chapter_task(scraper: ComickScraper, downloader: Downloader, chap: dict, base_output_dir: str, chapter_index: int, convert_to_pdf: bool, delete_images_after_pdf: bool, progress: Progress, chapter_task_id):
-    """Task for downloading a single chapter, to be used with ThreadPoolExecutor."""
-    try:
-        progress.console.print(f"\n[bold cyan]Downloading Chapter {chapter_index}: {chap['title']}[/bold cyan]")
-        image_urls, user_agent = scraper.fetch_image_urls(chap['url'])
-        if image_urls:
-            sanitized_title = sanitize_filename(chap['title'])
-            chapter_output_dir = os.path.join(base_output_dir, sanitized_title)
-            downloader.download_images(image_urls, chapter_output_dir, user_agent, chap['url'])
-            
-            if convert_to_pdf:
-                pdf_output_path = os.path.join(base_output_dir, f"{sanitized_title}.pdf")
-                downloader.convert_to_pdf(chapter_output_dir, pdf_output_path)
-                if delete_images_after_pdf:
-                    downloader.delete_images(chapter_output_dir)
-                    try:
-                        os.rmdir(chapter_output_dir) # Attempt to remove empty directory
-                        progress.console.print(f"🗑️ Removed empty chapter directory: {chapter_output_dir}")
-                    except OSError:
-                        pass # Directory might not be empty if non-image files exist
-        else:
-            progress.console.print(f"[bold red]Could not find any images for Chapter {chapter_index}.[/bold red]")
-    except Exception as e:
-        progress.console.print(f"[bold red]An unexpected error occurred while processing Chapter {chapter_index} ({chap['title']}): {e}[/bold red]")
-        progress.console.print(f"[bold red]Traceback:[/bold red]\n{traceback.format_exc()}")
-        raise # Re-raise to be caught by as_completed
-    finally:
-        progress.update(chapter_task_id, advance=1) # Ensure chapter task advances even on error
+    def _on_update(snapshot):
+        progress.update(
+            pages_task,
+            total=snapshot["pages_total"] or None,
+            completed=snapshot["pages_done"] + snapshot["pages_failed"],
+            transfer=format_transfer(snapshot),
+        )
+
+    return TransferProgress(_on_update, chapters_total=chapters_total)
+
+def _page_layout(split_strips: bool):
+    if not split_strips:
+        return None
+    from core.layout import PageLayout
+    return PageLayout()
+
+def _recording(record: str | None, replay: str | None):
+    if record and replay:
+        raise typer.BadParameter("--record and --replay cannot be used together.")
+    if not (record or replay):
+        return None
+    from core.recording import SessionRecording
+    return SessionRecording(record or replay, replay=bool(replay))
 
-def download_from_url(url: str, output: str | None, chapters_str: str | None, convert_to_pdf: bool, delete_images_after_pdf: bool, threads: int = 10):
+def download_from_url(url: str, output: str | None, chapters_str: str | None, convert_to_pdf: bool, delete_images_after_pdf: bool, threads: int = 10, scrape_workers: int = SCRAPE_WORKERS, package_workers: int = PACKAGE_WORKERS, http2: bool = DOWNLOAD_HTTP2, split_strips: bool = False, recording=None):
     """Handles the logic for downloading from a given URL."""
+    from core.scraper import ComickScraper
+    from core.downloader import Downloader, IncompleteChapterError
+    from core.tasks import download_chapter
+    from core.pipeline import ChapterPipeline
+    from core.scrape_pool import ScraperPool
+
     # Remove URL fragment if it exists
     url = url.split('#')[0]
     console.print("[bold cyan]MangaScraper for Comick.io[/bold cyan]")
     
-    scraper = ComickScraper()
-    downloader = Downloader()
+    scraper = ComickScraper(recording=recording)
+    downloader = Downloader(http2=http2, page_layout=_page_layout(split_strips))
     
     slug = get_comic_slug(url)
     sanitized_slug = sanitize_filename(slug)
     base_output_dir = output if output else os.path.join(DEFAULT_OUTPUT_DIR, sanitized_slug)
 
     chapters_to_download = []
-    if "/comic/" in url and "chapter" in url:
+    if is_chapter_url(url):
         # Single chapter URL
         console.print(f"📖 Downloading single chapter: [green]{url}[/green]")
-        image_urls, user_agent = scraper.fetch_image_urls(url)
-        if image_urls:
-            chapter_title_match = re.search(r'chapter-([^/]+)', url)
-            chapter_title = chapter_title_match.group(1) if chapter_title_match else "chapter"
-            chapter_output_dir = os.path.join(base_output_dir, chapter_title)
-            downloader.download_images(image_urls, chapter_output_dir, user_agent, url)
-
-            if convert_to_pdf:
-                pdf_output_path = os.path.join(base_output_dir, f"{sanitize_filename(chapter_title)}.pdf")
-                downloader.convert_to_pdf(chapter_output_dir, pdf_output_path)
-                if delete_images_after_pdf:
-                    downloader.delete_images(chapter_output_dir)
-                    try:
-                        os.rmdir(chapter_output_dir)
-                        console.print(f"🗑️ Removed empty chapter directory: {chapter_output_dir}")
-                    except OSError:
-                        pass
-        else:
+        chapter = {"title": get_chapter_slug(url), "url": url}
+        with _make_progress() as progress:
+            downloader.progress = _track_transfer(progress, 1)
+            with downloader.progress:
+                try:
+                    downloaded_bytes = download_chapter(scraper, downloader, chapter, base_output_dir, convert_to_pdf, delete_images_after_pdf, log=progress.console.print)
+                except IncompleteChapterError as e:
+                    console.print(f"[bold red]❌ {chapter['title']} is incomplete: {e}. Run the command again to retry the missing pages.[/bold red]")
+                    return
+        if downloaded_bytes is None:
             console.print("[bold red]Could not find any images to download.[/bold red]")
     else:
-        # Manga URL, fetch chapter list
-        chapters = scraper.fetch_chapter_list(url)
+        # Manga URL, fetch chapter list (revalidating the copy cached in the series directory)
+        chapters = scraper.fetch_chapter_list_cached(url, base_output_dir)
         if not chapters:
             console.print("[bold red]Could not fetch chapter list. Exiting.[/bold red]")
             return
@@ -130,36 +118,45 @@ def download_from_url(url: str, output: str | None, chapters_str: str | None, co
             console.print("[bold red]No chapters selected for download. Exiting.[/bold red]")
             return
 
-        with Progress(
-            TextColumn("[bold blue]{task.description}", justify="right"),
-            BarColumn(bar_width=None),
-            TaskProgressColumn(),
-            MofNCompleteColumn(),
-            "•",
-            TimeRemainingColumn(),
-            console=console # Use the shared console
-        ) as progress:
-            main_chapter_task = progress.add_task("[bold green]Overall Chapter Progress", total=len(chapters_to_download))
-
-            with ThreadPoolExecutor(max_workers=threads) as executor: # Threading for chapters
-                futures = []
-                for chap in chapters_to_download:
-                    # Pass the chapter index for logging purposes, not for direct list access
-                    chapter_index = chapters.index(chap) + 1 
-                    futures.append(executor.submit(_download_single_chapter_task, scraper, downloader, chap, base_output_dir, chapter_index, convert_to_pdf, delete_images_after_pdf, progress, main_chapter_task))
-                
-                for future in as_completed(futures):
-                    try:
-                        future.result() # This will re-raise any exception that occurred in the thread
-                    except Exception as e:
-                        progress.console.print(f"[bold red]A chapter download task failed: {e}[/bold red]")
-                        progress.console.print(f"[bold red]Traceback:[/bold red]\n{traceback.format_exc()}")
+        with _make_progress() as progress:
+            main_chapter_task = progress.add_task("[bold green]Overall Chapter Progress", total=len(chapters_to_download), transfer="")
+            downloader.progress = _track_transfer(progress, len(chapters_to_download))
 
+            def _on_update(stats):
+                active = stats["active"]
+                progress.update(
+                    main_chapter_task,
+                    completed=stats["finished"],
+                    description=f"[bold green]Chapters[/bold green] [dim]scrape {stats['scrape_queue']}+{active['scrape']} → download {stats['download_queue']}+{active['download']} → package {stats['package_queue']}+{active['package']}[/dim]"
+                )
+
+            # Image URLs are resolved in separate browser processes unless disabled
+            scrape_pool = ScraperPool(scrape_workers, recording=recording) if scrape_workers > 0 else None
+            try:
+                pipeline = ChapterPipeline(
+                    scrape_pool or scraper, downloader, base_output_dir, convert_to_pdf, delete_images_after_pdf,
+                    scrape_workers=scrape_workers if scrape_pool else threads,
+                    download_workers=threads,
+                    package_workers=package_workers,
+                    queue_size=PIPELINE_QUEUE_SIZE,
+                    log=progress.console.print,
+                    on_update=_on_update,
+                )
+                with downloader.progress:
+                    results = pipeline.run(chapters_to_download)
+            finally:
+                if scrape_pool:
+                    scrape_pool.close()
+
+        failed = [chap for chap, downloaded_bytes, _ in results if downloaded_bytes is None]
+        for chap in failed:
+            console.print(f"[bold red]Chapter {chapters.index(chap) + 1} ({chap['title']}) failed.[/bold red]")
 
     console.print("\n[bold green]✅ All selected chapters downloaded![/bold green]")
 
 def main_menu():
     """Displays the main menu and handles user choices."""
+    from core.scraper import ComickScraper
     scraper = ComickScraper()
     while True:
         console.print("\n[bold yellow]Select an option:[/bold yellow]")
@@ -223,12 +220,16 @@ def search(
     output: str = typer.Option(None, "--output", "-o", help="The base directory to save the downloaded chapters."),
     chapters: str = typer.Option(None, "--chapters", "-c", help="A string specifying chapters to download (e.g., '1,3-5', 'all')."),
     pdf: bool = typer.Option(False, "--pdf", "-p", help="Convert downloaded images to PDF."),
-    delete_images_after_pdf: bool = typer.Option(False, "--delete-images", "-d", help="Delete images after PDF conversion.")
+    delete_images_after_pdf: bool = typer.Option(False, "--delete-images", "-d", help="Delete images after PDF conversion."),
+    record: str = typer.Option(None, "--record", help="Record the scraper's network traffic (browser HAR files and cloudscraper responses) to this directory."),
+    replay: str = typer.Option(None, "--replay", help="Scrape offline, from traffic recorded with --record in this directory.")
 ):
     """
     Searches for a manga and downloads selected chapters.
     """
-    scraper = ComickScraper()
+    from core.scraper import ComickScraper
+    recording = _recording(record, replay)
+    scraper = ComickScraper(recording=recording)
     results = scraper.search_manga(query)
     if not results:
         console.print("[bold red]No results found.[/bold red]")
@@ -243,7 +244,7 @@ def search(
         selected_index = int(selection) - 1
         if 0 <= selected_index < len(results):
             selected_manga = results[selected_index]
-            download_from_url(selected_manga['url'], output, chapters, pdf, delete_images_after_pdf)
+            download_from_url(selected_manga['url'], output, chapters, pdf, delete_images_after_pdf, recording=recording)
         else:
             console.print("[bold red]Invalid selection.[/bold red]")
     except ValueError:
@@ -256,12 +257,297 @@ def download_command(
     chapters: str = typer.Option(None, "--chapters", "-c", help="A string specifying chapters to download (e.g., '1,3-5', 'all')."),
     pdf: bool = typer.Option(False, "--pdf", "-p", help="Convert downloaded images to PDF."),
     delete_images_after_pdf: bool = typer.Option(False, "--delete-images", "-d", help="Delete images after PDF conversion."),
-    threads: int = typer.Option(10, "--threads", "-t", help="Number of concurrent download threads (default: 10).")
+    threads: int = typer.Option(10, "--threads", "-t", help="Number of concurrent download threads (default: 10)."),
+    scrape_workers: int = typer.Option(SCRAPE_WORKERS, "--scrape-workers", "-s", help=f"Number of browser processes used to find chapter images, 0 to scrape in the download threads (default: {SCRAPE_WORKERS})."),
+    package_workers: int = typer.Option(PACKAGE_WORKERS, "--package-workers", help=f"Number of chapters converted to PDF at once (default: {PACKAGE_WORKERS})."),
+    http2: bool = typer.Option(DOWNLOAD_HTTP2, "--http2/--http1", help="Download images over HTTP/2 (needs httpx[http2]), sharing one connection per host."),
+    split_strips: bool = typer.Option(False, "--split-strips", help="When converting to PDF, cut long webtoon strips into pages at panel gaps and trim blank margins."),
+    record: str = typer.Option(None, "--record", help="Record the scraper's network traffic (browser HAR files and cloudscraper responses) to this directory."),
+    replay: str = typer.Option(None, "--replay", help="Scrape offline, from traffic recorded with --record in this directory."),
+    no_daemon: bool = typer.Option(False, "--no-daemon", help="Download in this process even if a daemon is running.")
 ):
     """
     Downloads manga chapters from Comick.io directly via arguments.
     """
-    download_from_url(url, output, chapters, pdf, delete_images_after_pdf, threads)
+    from core.daemon import daemon_is_running, submit_job
+
+    recording = _recording(record, replay)
+    # Hand the job to a running daemon, unless we need to prompt for a chapter selection or use options the daemon's jobs do not carry.
+    # The daemon's HTTP client is fixed when it starts (`serve --http2`), so a different choice is also honoured here
+    local_only = recording is not None or split_strips or http2 != DOWNLOAD_HTTP2
+    if not no_daemon and not local_only and (chapters or is_chapter_url(url)) and daemon_is_running():
+        # The daemon has its own working directory, so relative paths are resolved here
+        output_dir = os.path.abspath(output or os.path.join(DEFAULT_OUTPUT_DIR, sanitize_filename(get_comic_slug(url.split('#')[0]))))
+        job = {"url": url, "chapters": chapters, "output": output_dir, "pdf": pdf, "delete_images": delete_images_after_pdf, "threads": threads}
+        job_id = submit_job(job)
+        console.print(f"[bold green]📨 Submitted job {job_id} to the daemon at http://{DAEMON_HOST}:{DAEMON_PORT}[/bold green]")
+        return
+    download_from_url(url, output, chapters, pdf, delete_images_after_pdf, threads, scrape_workers, package_workers, http2, split_strips, recording)
+
+@app.command()
+def batch(
+    file: str = typer.Argument(..., help="A file with one manga or chapter URL per line, optionally followed by a chapter selection."),
+    output: str = typer.Option(None, "--output", "-o", help="The base directory; each series is saved in its own subdirectory."),
+    pdf: bool = typer.Option(False, "--pdf", "-p", help="Convert downloaded images to PDF."),
+    delete_images_after_pdf: bool = typer.Option(False, "--delete-images", "-d", help="Delete images after PDF conversion."),
+    threads: int = typer.Option(10, "--threads", "-t", help="Number of chapters downloaded at once across all series (default: 10)."),
+    rate: float = typer.Option(0, "--rate", "-r", help="Maximum image requests per second across all series (default: unlimited)."),
+    http2: bool = typer.Option(DOWNLOAD_HTTP2, "--http2/--http1", help="Download images over HTTP/2 (needs httpx[http2]), sharing one connection per host."),
+    scrape_workers: int = typer.Option(SCRAPE_WORKERS, "--scrape-workers", "-s", help=f"Number of browser processes used to find chapter images, 0 to scrape in the download threads (default: {SCRAPE_WORKERS})."),
+    split_strips: bool = typer.Option(False, "--split-strips", help="When converting to PDF, cut long webtoon strips into pages at panel gaps and trim blank margins.")
+):
+    """
+    Downloads many series from one input file under a shared, fair scheduler.
+    """
+    from rich.table import Table
+    from rich.filesize import decimal
+    from core.scraper import ComickScraper
+    from core.downloader import Downloader
+    from core.tasks import download_chapter
+    from core.scheduler import FairScheduler, RateLimiter
+    from core.scrape_pool import ScraperPool
+
+    console.print("[bold cyan]MangaScraper for Comick.io[/bold cyan]")
+    scraper = ComickScraper()
+    downloader = Downloader(rate_limiter=RateLimiter(rate) if rate > 0 else None, http2=http2, page_layout=_page_layout(split_strips))
+
+    groups = {}
+    for url, selection in parse_batch_file(file):
+        url = url.split('#')[0]
+        series = sanitize_filename(get_comic_slug(url))
+        base_output_dir = os.path.join(output or DEFAULT_OUTPUT_DIR, series)
+        groups.setdefault(series, [])
+
+        if is_chapter_url(url):
+            groups[series].append(({"title": get_chapter_slug(url), "url": url}, base_output_dir))
+            continue
+
+        chapters = scraper.fetch_chapter_list_cached(url, base_output_dir)
+        if not chapters:
+            console.print(f"[bold red]Could not fetch chapter list for {url}. Skipping.[/bold red]")
+            continue
+        try:
+            selected_indices = parse_chapter_selection(selection or 'all', len(chapters))
+        except ValueError:
+            console.print(f"[bold red]Invalid chapter selection '{selection}' for {url}. Skipping.[/bold red]")
+            continue
+        groups[series].extend((chapters[i-1], base_output_dir) for i in selected_indices if 1 <= i <= len(chapters))
+
+    total = sum(len(entries) for entries in groups.values())
+    if not total:
+        console.print("[bold red]No chapters selected for download. Exiting.[/bold red]")
+        return
+
+    with _make_progress() as progress:
+        batch_task = progress.add_task("[bold green]Overall Batch Progress", total=total, transfer="")
+        downloader.progress = _track_transfer(progress, total)
+
+        scrape_pool = ScraperPool(scrape_workers) if scrape_workers > 0 else None
+
+        def _run(series, entry):
+            chap, base_output_dir = entry
+            try:
+                progress.console.print(f"\n[bold cyan]Downloading {series}: {chap['title']}[/bold cyan]")
+                return download_chapter(scrape_pool or scraper, downloader, chap, base_output_dir, pdf, delete_images_after_pdf, log=progress.console.print)
+            finally:
+                progress.update(batch_task, advance=1)
+
+        try:
+            with downloader.progress:
+                results = FairScheduler(threads).run(groups, _run)
+        finally:
+            if scrape_pool:
+                scrape_pool.close()
+
+    table = Table(title="Batch Summary")
+    table.add_column("Series")
+    table.add_column("Succeeded", justify="right", style="green")
+    table.add_column("Failed", justify="right", style="red")
+    table.add_column("Downloaded", justify="right")
+    total_ok, total_failed, total_bytes = 0, 0, 0
+    for series, outcomes in results.items():
+        ok = [result for _, result, error in outcomes if error is None and result is not None]
+        failed = [(chap, error) for (chap, _), result, error in outcomes if error is not None or result is None]
+        for chap, error in failed:
+            console.print(f"[bold red]❌ {series}: {chap['title']} failed: {error or 'no images found'}[/bold red]")
+        table.add_row(series, str(len(ok)), str(len(failed)), decimal(sum(ok)))
+        total_ok, total_failed, total_bytes = total_ok + len(ok), total_failed + len(failed), total_bytes + sum(ok)
+    table.add_row("[bold]Total[/bold]", str(total_ok), str(total_failed), decimal(total_bytes))
+    console.print(table)
+
+@app.command()
+def verify(
+    path: str = typer.Argument(DEFAULT_OUTPUT_DIR, help="A library, series or chapter directory to check (default: the downloads directory)."),
+    http2: bool = typer.Option(DOWNLOAD_HTTP2, "--http2/--http1", help="Download images over HTTP/2 (needs httpx[http2]), sharing one connection per host.")
+):
+    """
+    Checks downloaded chapters against the server and re-downloads missing, corrupt or changed pages.
+    """
+    from rich.table import Table
+    from rich.filesize import decimal
+    from core.downloader import Downloader
+
+    chapter_dirs, pdf_sidecars, without_metadata = [], [], []
+    for root, _, files in os.walk(path):
+        if METADATA_FILENAME in files:
+            chapter_dirs.append(root)
+        elif any(f.endswith(('.png', '.jpg', '.jpeg')) for f in files):
+            without_metadata.append(root)
+        # Chapters kept only as PDFs (--delete-images) have their metadata next to the PDF
+        pdf_sidecars.extend(os.path.join(root, f) for f in files if f.endswith(METADATA_FILENAME) and f != METADATA_FILENAME)
+        without_metadata.extend(
+            os.path.join(root, f) for f in files
+            if f.endswith('.pdf') and f"{f[:-4]}{METADATA_FILENAME}" not in files and not os.path.isdir(os.path.join(root, f[:-4]))
+        )
+    chapter_dirs.sort()
+    pdf_sidecars.sort()
+
+    if without_metadata:
+        console.print(f"[yellow]⚠️ Skipping {len(without_metadata)} chapter(s) or PDF(s) without page metadata (downloaded before it was recorded, or not chapters). Download them again to make them verifiable.[/yellow]")
+    if not chapter_dirs and not pdf_sidecars:
+        console.print(f"[bold red]No verifiable chapters found in {path}.[/bold red]")
+        return
+
+    downloader = Downloader(http2=http2)
+    totals = {"unchanged": 0, "refetched": 0, "repaired": 0, "stale": 0, "unvalidated": 0, "failed": 0, "bytes": 0}
+    with _make_progress() as progress:
+        task = progress.add_task("[bold green]Verifying chapters", total=len(chapter_dirs) + len(pdf_sidecars), transfer="")
+        for chapter_dir in chapter_dirs:
+            summary = downloader.verify_images(chapter_dir)
+            if summary:
+                for key in summary:
+                    totals[key] += summary[key]
+                if summary["refetched"] or summary["repaired"] or summary["failed"]:
+                    progress.console.print(
+                        f"🔁 {os.path.relpath(chapter_dir, path)}: {summary['refetched']} changed, "
+                        f"{summary['repaired']} repaired, {summary['failed']} failed"
+                    )
+            progress.update(task, advance=1)
+        for sidecar in pdf_sidecars:
+            summary = downloader.verify_pdf_pages(sidecar)
+            for key in summary:
+                totals[key] += summary[key]
+            if summary["stale"] or summary["failed"]:
+                pdf_name = os.path.relpath(sidecar, path)[:-len(METADATA_FILENAME)] + ".pdf"
+                progress.console.print(
+                    f"📕 {pdf_name}: {summary['stale']} page(s) changed on the server, {summary['failed']} failed. "
+                    "Download the chapter again to rebuild the PDF."
+                )
+            progress.update(task, advance=1)
+
+    table = Table(title="Verify Summary")
+    table.add_column("Chapters", justify="right")
+    table.add_column("Unchanged (304)", justify="right", style="green")
+    table.add_column("Changed", justify="right", style="yellow")
+    table.add_column("Repaired", justify="right", style="yellow")
+    table.add_column("Stale in PDF", justify="right", style="yellow")
+    table.add_column("No validators", justify="right", style="dim")
+    table.add_column("Failed", justify="right", style="red")
+    table.add_column("Downloaded", justify="right")
+    table.add_row(
+        str(len(chapter_dirs) + len(pdf_sidecars)), str(totals["unchanged"]), str(totals["refetched"]), str(totals["repaired"]),
+        str(totals["stale"]), str(totals["unvalidated"]), str(totals["failed"]), decimal(totals["bytes"])
+    )
+    console.print(table)
+    if totals["unvalidated"]:
+        console.print(f"[dim]{totals['unvalidated']} page(s) were served without ETag/Last-Modified, so they cannot be checked without downloading them again.[/dim]")
+    if totals["failed"]:
+        raise typer.Exit(code=1)
+
+@app.command()
+def volume(
+    inputs: list[str] = typer.Argument(..., help="Chapter PDFs or CBZs in reading order, or directories holding them (sorted by name)."),
+    output: str = typer.Option(..., "--output", "-o", help="The volume to write; .pdf or .cbz."),
+    append: bool = typer.Option(False, "--append", "-a", help="Add the chapters to an existing volume, skipping ones it already contains.")
+):
+    """
+    Merges downloaded chapter PDFs (or CBZs) into one volume without re-encoding any pages.
+    """
+    from core.volume import build_volume
+
+    try:
+        added = build_volume(inputs, output, append)
+    except (ValueError, RuntimeError, OSError) as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=1)
+    if added:
+        console.print(f"[bold green]📚 Added {len(added)} chapter(s) to {output}[/bold green]")
+    else:
+        console.print(f"[bold yellow]{output} already contains all of these chapters.[/bold yellow]")
+
+@app.command()
+def enqueue(
+    url: str = typer.Argument(..., help="The URL of the Comick.io manga or chapter."),
+    chapters: str = typer.Option("all", "--chapters", "-c", help="A string specifying chapters to queue (e.g., '1,3-5', 'all')."),
+    output: str = typer.Option(None, "--output", "-o", help="The directory to save the chapters in. Use a path all workers can reach."),
+    pdf: bool = typer.Option(False, "--pdf", "-p", help="Convert downloaded images to PDF."),
+    delete_images_after_pdf: bool = typer.Option(False, "--delete-images", "-d", help="Delete images after PDF conversion."),
+    queue: str = typer.Option(WORK_QUEUE_PATH, "--queue", "-q", help="The shared SQLite queue file.")
+):
+    """
+    Adds chapters to a shared work queue for `worker` processes to download.
+    """
+    from core.jobs import ChapterQueue
+
+    url = url.split('#')[0]
+    base_output_dir = os.path.abspath(output or os.path.join(DEFAULT_OUTPUT_DIR, sanitize_filename(get_comic_slug(url))))
+
+    if is_chapter_url(url):
+        selected = [{"title": get_chapter_slug(url), "url": url}]
+    else:
+        from core.scraper import ComickScraper
+        all_chapters = ComickScraper().fetch_chapter_list_cached(url, base_output_dir)
+        if not all_chapters:
+            console.print("[bold red]Could not fetch chapter list. Exiting.[/bold red]")
+            return
+        selected = [all_chapters[i-1] for i in parse_chapter_selection(chapters, len(all_chapters)) if 1 <= i <= len(all_chapters)]
+
+    chapter_queue = ChapterQueue(queue)
+    added = chapter_queue.enqueue(selected, base_output_dir, pdf, delete_images_after_pdf)
+    console.print(f"[bold green]📥 Queued {added} new chapter(s) in {queue}.[/bold green] Status: {chapter_queue.counts()}")
+    chapter_queue.close()
+
+@app.command()
+def worker(
+    queue: str = typer.Option(WORK_QUEUE_PATH, "--queue", "-q", help="The shared SQLite queue file."),
+    threads: int = typer.Option(2, "--threads", "-t", help="Number of chapters this worker downloads at once (default: 2)."),
+    lease: float = typer.Option(WORKER_LEASE_SECONDS, "--lease", help="Seconds a claimed chapter stays reserved without a heartbeat."),
+    wait: bool = typer.Option(False, "--wait", "-w", help="Keep polling for new chapters instead of exiting when the queue is empty."),
+    http2: bool = typer.Option(DOWNLOAD_HTTP2, "--http2/--http1", help="Download images over HTTP/2 (needs httpx[http2]), sharing one connection per host."),
+    scrape_workers: int = typer.Option(SCRAPE_WORKERS, "--scrape-workers", "-s", help=f"Number of browser processes used to find chapter images, 0 to scrape in the download threads (default: {SCRAPE_WORKERS})."),
+    split_strips: bool = typer.Option(False, "--split-strips", help="When converting to PDF, cut long webtoon strips into pages at panel gaps and trim blank margins.")
+):
+    """
+    Downloads chapters from a shared work queue. Run several workers, on one or more hosts, to share the load.
+    """
+    from core.scraper import ComickScraper
+    from core.downloader import Downloader
+    from core.scrape_pool import ScraperPool
+    from core.jobs import ChapterQueue
+    from core.worker import ChapterWorker
+
+    chapter_queue = ChapterQueue(queue)
+    scrape_pool = ScraperPool(scrape_workers) if scrape_workers > 0 else None
+    try:
+        ChapterWorker(chapter_queue, scrape_pool or ComickScraper(), Downloader(http2=http2, page_layout=_page_layout(split_strips)), threads=threads, lease_seconds=lease, wait=wait).run()
+    finally:
+        if scrape_pool:
+            scrape_pool.close()
+        chapter_queue.close()
+
+@app.command()
+def serve(
+    host: str = typer.Option(DAEMON_HOST, "--host", help="Address for the local job API."),
+    port: int = typer.Option(DAEMON_PORT, "--port", help="Port for the local job API."),
+    db: str = typer.Option(DAEMON_DB_PATH, "--db", help="SQLite file that persists the job queue."),
+    scrape_workers: int = typer.Option(SCRAPE_WORKERS, "--scrape-workers", "-s", help=f"Number of browser processes kept warm to find chapter images (default: {SCRAPE_WORKERS})."),
+    http2: bool = typer.Option(DOWNLOAD_HTTP2, "--http2/--http1", help="Download images over HTTP/2 (needs httpx[http2]), sharing one connection per host.")
+):
+    """
+    Runs a long-lived download daemon that keeps the scraper warm and accepts jobs over a local HTTP API.
+    """
+    from core.daemon import DownloadDaemon
+    DownloadDaemon(db, host=host, port=port, scrape_workers=scrape_workers, http2=http2).serve_forever()
 
 @app.callback(invoke_without_command=True)
 def main(ctx: typer.Context):
@@ -0,0 +1,61 @@
+# core/cancel.py
+import threading
+import time
+
+class DownloadCancelled(Exception):
+    """Raised inside scraping and downloading code once its CancelToken is cancelled."""
+
+class CancelToken:
+    """
+    Cooperative cancellation and pause/resume flag shared by the GUI, the
+    scraper and the downloader. Long-running code calls check() between
+    navigations and image chunks, and sleep() instead of time.sleep().
+    """
+    def __init__(self, cancel_event=None):
+        # Any object with Event's interface works, e.g. a multiprocessing.Event
+        # shared with a scraping process.
+        self._cancelled = cancel_event if cancel_event is not None else threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set() # Wake up anything that is paused so it can stop
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def check(self):
+        """Blocks while paused and raises DownloadCancelled once cancelled."""
+        while not self._running.wait(timeout=0.25):
+            if self._cancelled.is_set():
+                break
+        if self._cancelled.is_set():
+            raise DownloadCancelled()
+
+    def sleep(self, seconds: float):
+        """Sleeps like time.sleep(), but wakes up and raises DownloadCancelled as soon as the token is cancelled."""
+        deadline = time.monotonic() + seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self._cancelled.wait(timeout=min(remaining, 0.25)):
+                break
+        self.check()
+
+def check_cancelled(cancel_token: CancelToken | None):
+    """Convenience for code where the token is optional."""
+    if cancel_token is not None:
+        cancel_token.check()
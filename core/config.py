@@ -10,4 +10,67 @@ HEADERS = {
 }
 
 # Default output directory
-DEFAULT_OUTPUT_DIR = "downloads"
\ No newline at end of file
+DEFAULT_OUTPUT_DIR = "downloads"
+
+# Local download daemon (see `cli/main.py serve`)
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+DAEMON_DB_PATH = "comick_jobs.db"
+
+# Shared chapter work queue (see `cli/main.py enqueue` and `cli/main.py worker`)
+WORK_QUEUE_PATH = "comick_queue.db"
+WORKER_LEASE_SECONDS = 120
+
+# Number of dedicated browser processes used to find chapter image URLs
+SCRAPE_WORKERS = 2
+
+# Chapter pipeline (scrape -> download -> package)
+PACKAGE_WORKERS = 2
+PIPELINE_QUEUE_SIZE = 4
+
+# Requests the scraper's browser skips while loading chapter pages. Only the
+# image URLs are needed, and Downloader fetches the images itself afterwards.
+SCRAPER_BLOCK_RESOURCES = True
+SCRAPER_BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+# Scripts from these hosts (and their subdomains) are first-party and always loaded
+SCRAPER_FIRST_PARTY_HOSTS = ("comick.io",)
+# Requests to these hosts (and their subdomains) are never blocked
+SCRAPER_RESOURCE_ALLOWLIST = ("challenges.cloudflare.com",)
+
+# Image downloads: read/write buffer size, and how many extra passes over a
+# chapter's failed pages are made after the first one
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_REQUEUE_PASSES = 2
+
+# HTTP client for image downloads. HTTP/2 multiplexes all pages from a host over
+# one connection and needs the optional httpx[http2] dependency (`--http2`).
+DOWNLOAD_HTTP2 = False
+DOWNLOAD_POOL_SIZE = 32
+
+# Metadata kept next to downloads: a chapter's image URLs and page validators
+# (ETag/Last-Modified), and a series' cached chapter list. See `cli/main.py verify`.
+METADATA_FILENAME = ".comick.json"
+SERIES_METADATA_FILENAME = ".comick-series.json"
+
+# GUI prefetching of image URL lists while chapters are being picked: at most
+# this many chapters at a time, trusted for this many seconds
+PREFETCH_BUDGET = 3
+PREFETCH_TTL_SECONDS = 600
+
+# Webtoon page layout for PDFs (`--split-strips`): images at least STRIP_MIN_ASPECT
+# times as tall as wide are re-cut into pages about STRIP_PAGE_ASPECT times as tall
+# as wide, at rows whose colour varies by at most STRIP_GUTTER_TOLERANCE
+STRIP_PAGE_ASPECT = 1.5
+STRIP_MIN_ASPECT = 2.5
+STRIP_GUTTER_TOLERANCE = 12
+
+# Interchangeable image hosts. Each group lists origins that serve the same paths;
+# a page URL on any of them is fetched from whichever is fastest and healthy, e.g.
+# IMAGE_MIRRORS = (("https://meo.comick.pictures", "https://meo2.comick.pictures"),)
+IMAGE_MIRRORS = ()
+# Host statistics: weight of the newest sample in the moving averages, failures in a
+# row before a host rests, seconds it rests, and seconds before an unused host is retried
+HOST_EWMA_ALPHA = 0.3
+HOST_FAILURE_LIMIT = 3
+HOST_COOLDOWN_SECONDS = 30
+HOST_REPROBE_SECONDS = 120
@@ -0,0 +1,192 @@
+# core/daemon.py
+import json
+import os
+import threading
+import traceback
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .config import DAEMON_HOST, DAEMON_PORT, DEFAULT_OUTPUT_DIR, DOWNLOAD_HTTP2
+from .jobs import JobQueue
+from .tasks import download_chapter
+from utils.sanitizer import sanitize_filename
+from utils.selection import get_comic_slug, get_chapter_slug, is_chapter_url, parse_chapter_selection
+
+class DownloadDaemon:
+    """
+    Long-running download service. Keeps one scraper and downloader warm,
+    accepts jobs over a local HTTP API and persists them in a JobQueue.
+    """
+    def __init__(self, db_path: str, host: str = DAEMON_HOST, port: int = DAEMON_PORT, scrape_workers: int = 0, http2: bool = DOWNLOAD_HTTP2):
+        # Imported here so that the client helpers below stay cheap to import.
+        from .scraper import ComickScraper
+        from .downloader import Downloader
+        from .scrape_pool import ScraperPool
+
+        self.host = host
+        self.port = port
+        self.queue = JobQueue(db_path)
+        self.scraper = ComickScraper()
+        self.downloader = Downloader(http2=http2)
+        # Warm browser processes for image URLs; chapter lists still use self.scraper
+        self.scrape_pool = ScraperPool(scrape_workers) if scrape_workers > 0 else None
+        self.image_source = self.scrape_pool or self.scraper
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.server = None
+
+    def serve_forever(self):
+        """Starts the job worker and serves the HTTP API until interrupted."""
+        requeued = self.queue.requeue_interrupted()
+        if requeued:
+            print(f"🔁 Requeued {requeued} interrupted job(s).")
+
+        worker = threading.Thread(target=self._worker_loop, daemon=True)
+        worker.start()
+
+        self.server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        print(f"🛰️ Daemon listening on http://{self.host}:{self.port}")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stopping.set()
+            self.wakeup.set()
+            self.server.server_close()
+            worker.join()
+            if self.scrape_pool:
+                self.scrape_pool.close()
+            self.queue.close()
+            print("👋 Daemon stopped.")
+
+    def submit(self, job: dict) -> int:
+        job_id = self.queue.submit(
+            job['url'],
+            chapters=job.get('chapters'),
+            output=job.get('output'),
+            pdf=bool(job.get('pdf', False)),
+            delete_images=bool(job.get('delete_images', False)),
+            threads=int(job.get('threads', 10)),
+        )
+        self.wakeup.set()
+        return job_id
+
+    def _worker_loop(self):
+        while not self.stopping.is_set():
+            job = self.queue.claim_next()
+            if job is None:
+                self.wakeup.wait(timeout=5)
+                self.wakeup.clear()
+                continue
+
+            print(f"▶️ Starting job {job['id']}: {job['url']}")
+            try:
+                self.run_job(job)
+            except Exception as e:
+                print(f"❌ Job {job['id']} failed: {e}")
+                traceback.print_exc()
+                self.queue.finish(job['id'], error=str(e))
+            else:
+                print(f"✅ Job {job['id']} finished.")
+                self.queue.finish(job['id'])
+
+    def run_job(self, job: dict):
+        """Runs a single job with the warm scraper and downloader."""
+        url = job['url'].split('#')[0]
+        base_output_dir = job['output'] or os.path.join(DEFAULT_OUTPUT_DIR, sanitize_filename(get_comic_slug(url)))
+
+        if is_chapter_url(url):
+            chapter = {"title": get_chapter_slug(url), "url": url}
+            if download_chapter(self.image_source, self.downloader, chapter, base_output_dir, bool(job['pdf']), bool(job['delete_images'])) is None:
+                raise RuntimeError("Could not find any images to download.")
+            return
+
+        chapters = self.scraper.fetch_chapter_list(url)
+        if not chapters:
+            raise RuntimeError("Could not fetch chapter list.")
+
+        selected = [chapters[i - 1] for i in parse_chapter_selection(job['chapters'] or 'all', len(chapters)) if 1 <= i <= len(chapters)]
+        if not selected:
+            raise RuntimeError("No chapters selected for download.")
+
+        failures = 0
+        with ThreadPoolExecutor(max_workers=job['threads']) as executor:
+            futures = [executor.submit(download_chapter, self.image_source, self.downloader, chap, base_output_dir, bool(job['pdf']), bool(job['delete_images'])) for chap in selected]
+            for future in as_completed(futures):
+                try:
+                    if future.result() is None:
+                        failures += 1
+                except Exception as e:
+                    print(f"❌ A chapter download task failed: {e}")
+                    failures += 1
+
+        if failures:
+            raise RuntimeError(f"{failures} of {len(selected)} chapters failed.")
+
+def _make_handler(daemon: DownloadDaemon):
+    class DaemonRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/jobs":
+                self._send_json(200, daemon.queue.list())
+            elif self.path.startswith("/jobs/"):
+                try:
+                    job = daemon.queue.get(int(self.path[len("/jobs/"):]))
+                except ValueError:
+                    job = None
+                if job:
+                    self._send_json(200, job)
+                else:
+                    self._send_json(404, {"error": "job not found"})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/jobs":
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                job = json.loads(self.rfile.read(length) or b"{}")
+                if not job.get("url"):
+                    raise ValueError("'url' is required")
+                job_id = daemon.submit(job)
+            except (ValueError, TypeError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            self._send_json(201, {"id": job_id})
+
+        def log_message(self, format, *args):
+            pass # Keep the daemon output focused on jobs
+
+    return DaemonRequestHandler
+
+def daemon_is_running(host: str = DAEMON_HOST, port: int = DAEMON_PORT) -> bool:
+    """Returns True if a daemon answers on the given address."""
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/health", timeout=1) as resp:
+            return resp.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+def submit_job(job: dict, host: str = DAEMON_HOST, port: int = DAEMON_PORT) -> int:
+    """Submits a job to a running daemon and returns the job id."""
+    request = urllib.request.Request(
+        f"http://{host}:{port}/jobs",
+        data=json.dumps(job).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=10) as resp:
+        return json.loads(resp.read())["id"]
@@ -1,46 +1,144 @@
 # core/downloader.py
 import os
-import requests
 import time
-from rich.progress import Progress, BarColumn, TextColumn, TransferSpeedColumn, TimeRemainingColumn, TaskID
-from .config import HEADERS
+from .cancel import DownloadCancelled, check_cancelled
+from .config import HEADERS, DOWNLOAD_CHUNK_SIZE, DOWNLOAD_REQUEUE_PASSES, DOWNLOAD_HTTP2, DOWNLOAD_POOL_SIZE, METADATA_FILENAME
+from .hosts import HostSelector, origin_of
+from .tasks import IncompleteChapterError # Defined there so the daemon client does not import this module
+from .transport import make_transport
+from .validators import MetadataFile, conditional_headers
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from PIL import Image
-import io
+
+class IncompleteDownloadError(Exception):
+    """Raised when a downloaded image is truncated or cannot be decoded."""
+
+def pdf_metadata_path(pdf_path: str) -> str:
+    """Where the page metadata of a chapter kept only as a PDF lives: 'Chapter 1.pdf' -> 'Chapter 1.comick.json'."""
+    return f"{os.path.splitext(pdf_path)[0]}{METADATA_FILENAME}"
 
 class Downloader:
     """
     Handles downloading and saving images from a list of URLs with a progress bar.
     """
-    def _download_image(self, url: str, headers: dict, output_dir: str, idx: int, total_images: int, max_retries: int = 3):
-        """Helper function to download a single image with retries."""
+    def __init__(self, rate_limiter=None, chunk_size: int = DOWNLOAD_CHUNK_SIZE, requeue_passes: int = DOWNLOAD_REQUEUE_PASSES, progress=None, transport=None, http2: bool = DOWNLOAD_HTTP2, page_layout=None, hosts=None):
+        # Connection pool shared by all image requests: requests over HTTP/1.1, or httpx over HTTP/2
+        self.transport = transport or make_transport(http2, DOWNLOAD_POOL_SIZE)
+        # Optional shared RateLimiter that every image request must pass through
+        self.rate_limiter = rate_limiter
+        self.chunk_size = chunk_size
+        self.requeue_passes = requeue_passes
+        # Optional TransferProgress counting pages and bytes across all chapters
+        self.progress = progress
+        # Optional PageLayout that re-cuts webtoon strips and trims margins before PDF conversion
+        self.page_layout = page_layout
+        # Latency and error statistics per image host, used to pick the best mirror (IMAGE_MIRRORS) for each request
+        self.hosts = hosts or HostSelector()
+
+    @staticmethod
+    def _verify_image(path: str):
+        """Checks that an image file decodes completely, raising IncompleteDownloadError if not."""
+        try:
+            with Image.open(path) as image:
+                image.load() # verify() only checks headers and would accept a truncated JPEG
+        except Exception as e:
+            raise IncompleteDownloadError(f"{os.path.basename(path)} is not a valid image: {e}") from e
+
+    def _write_response(self, response, filename: str, cancel_token=None) -> int:
+        """
+        Streams a response to a temporary file next to filename, checks it
+        against Content-Length and a decode probe, then atomically moves it
+        into place. A page file therefore either is complete or does not exist.
+        """
+        temp_filename = f"{filename}.part"
+        written = 0
+        try:
+            with open(temp_filename, "wb", buffering=self.chunk_size) as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    check_cancelled(cancel_token)
+                    f.write(chunk)
+                    written += len(chunk)
+                    if self.progress:
+                        self.progress.add_bytes(len(chunk))
+
+            expected = response.headers.get("Content-Length")
+            # With a Content-Encoding, Content-Length counts the encoded bytes, not what we wrote
+            if expected and not response.headers.get("Content-Encoding") and int(expected) != written:
+                raise IncompleteDownloadError(f"expected {expected} bytes, got {written}")
+            self._verify_image(temp_filename)
+            os.replace(temp_filename, filename)
+        except BaseException:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+            raise
+        return written
+
+    @staticmethod
+    def _page_filename(output_dir: str, idx: int, url: str) -> str:
+        ext = url.split(".")[-1].split("?")[0]
+        return os.path.join(output_dir, f"{idx:03d}.{ext}")
+
+    def _download_image(self, url: str, headers: dict, output_dir: str, idx: int, total_images: int, max_retries: int = 3, cancel_token=None, metadata=None):
+        """Helper function to download a single image with retries, failing over to mirrors of its host."""
+        failed_hosts = set()
         for attempt in range(max_retries):
+            check_cancelled(cancel_token)
+            request_url = url
             try:
-                ext = url.split(".")[-1].split("?")[0]
-                filename = os.path.join(output_dir, f"{idx:03d}.{ext}")
-                
-                img_res = requests.get(url, headers=headers, stream=True, timeout=15) # 15-second timeout
-                img_res.raise_for_status()
+                filename = self._page_filename(output_dir, idx, url)
 
-                if not img_res.headers.get("Content-Type", "").startswith("image"):
-                    print(f"⚠️ Skipped non-image: {url}")
-                    return None
+                if os.path.exists(filename):
+                    try:
+                        self._verify_image(filename)
+                        if self.progress:
+                            self.progress.page_finished()
+                        return filename # Complete from an earlier run
+                    except IncompleteDownloadError:
+                        os.remove(filename)
+
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                request_url = self.hosts.choose(url, avoid=failed_hosts)
+                # Closing the response on the way out releases the connection even when cancelled mid-transfer
+                start = time.monotonic()
+                with self.transport.stream(request_url, headers, timeout=15) as img_res: # 15-second timeout
+                    latency = time.monotonic() - start
+                    if not img_res.headers.get("Content-Type", "").startswith("image"):
+                        # E.g. an edge error page served with 200: not a healthy answer from this host
+                        self.hosts.record(request_url, None)
+                        failed_hosts.add(origin_of(request_url))
+                        if attempt < max_retries - 1 and any(origin not in failed_hosts for origin in self.hosts.alternatives(url)):
+                            print(f"⚠️ Non-image response from {request_url}, retrying on a mirror...")
+                            continue
+                        print(f"⚠️ Skipped non-image: {request_url}")
+                        return None
 
-                with open(filename, "wb") as f:
-                    for chunk in img_res.iter_content(chunk_size=8192):
-                        f.write(chunk)
+                    written = self._write_response(img_res, filename, cancel_token)
+                    self.hosts.record(request_url, latency)
+                    if metadata is not None:
+                        metadata.set_page(os.path.basename(filename), url, img_res.headers, written)
+                if self.progress:
+                    self.progress.page_finished()
                 print(f"Downloaded image {idx}/{total_images} for {os.path.basename(output_dir)}")
                 return filename
-            except requests.exceptions.RequestException as e:
-                print(f"❌ Error downloading {url} (attempt {attempt + 1}/{max_retries}): {e}")
+            except (*self.transport.errors, IncompleteDownloadError) as e:
+                print(f"❌ Error downloading {request_url} (attempt {attempt + 1}/{max_retries}): {e}")
+                self.hosts.record(request_url, None)
+                failed_hosts.add(origin_of(request_url))
                 if attempt < max_retries - 1:
+                    if any(origin not in failed_hosts for origin in self.hosts.alternatives(url)):
+                        print("Retrying on a mirror...")
+                        continue
                     print("Retrying in 5 seconds...")
-                    time.sleep(5)
+                    if cancel_token:
+                        cancel_token.sleep(5)
+                    else:
+                        time.sleep(5)
                 else:
                     print(f"❌ Failed to download {url} after {max_retries} attempts.")
                     return None
 
-    def download_images(self, image_urls: list[str], output_dir: str, user_agent: str, chapter_url: str):
+    def download_images(self, image_urls: list[str], output_dir: str, user_agent: str, chapter_url: str, cancel_token=None):
         """
         Downloads images from the given URLs in parallel and saves them to the output directory.
 
@@ -49,6 +147,13 @@ class Downloader:
             output_dir: The directory to save the images in.
             user_agent: The User-Agent to use for the request headers.
             chapter_url: The original chapter URL for the Referer header.
+            cancel_token: Optional CancelToken checked before each request and between chunks.
+
+        Returns:
+            A list of the paths of the successfully downloaded images.
+
+        Raises:
+            DownloadCancelled: If the token is cancelled.
         """
         os.makedirs(output_dir, exist_ok=True)
         
@@ -57,14 +162,185 @@ class Downloader:
         headers["Referer"] = chapter_url
 
         total_images = len(image_urls)
+        if self.progress:
+            self.progress.add_chapter(total_images)
+        # Remember where the pages came from and their validators, for verify_images()
+        metadata = MetadataFile(os.path.join(output_dir, METADATA_FILENAME))
+        metadata.update(chapter_url=chapter_url, user_agent=user_agent, image_urls=list(image_urls))
+        if image_urls:
+            self.hosts.probe(image_urls[0], self.transport, headers)
+        try:
+            return self._download_pages(image_urls, output_dir, headers, metadata, cancel_token)
+        finally:
+            metadata.save()
+
+    def _download_pages(self, image_urls: list[str], output_dir: str, headers: dict, metadata, cancel_token=None):
+        total_images = len(image_urls)
+        saved_files = []
+        remaining = list(enumerate(image_urls, start=1))
+        # Pages that still fail after their retries are requeued behind the rest of the chapter
+        for attempt_pass in range(1 + self.requeue_passes):
+            if not remaining:
+                break
+            if attempt_pass:
+                print(f"🔁 Requeueing {len(remaining)} failed page(s) for {os.path.basename(output_dir)} (pass {attempt_pass}/{self.requeue_passes})")
+            failed = []
+            cancelled = False
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                futures = {executor.submit(self._download_image, url, headers, output_dir, idx, total_images, cancel_token=cancel_token, metadata=metadata): (idx, url) for idx, url in remaining}
+                
+                for future in as_completed(futures):
+                    try:
+                        filename = future.result() # Re-raise exceptions from threads
+                    except DownloadCancelled:
+                        cancelled = True
+                        filename = None
+                    except Exception as e:
+                        print(f"[bold red]Error in image download thread: {e}[/bold red]")
+                        filename = None
+                    if filename:
+                        saved_files.append(filename)
+                    else:
+                        failed.append(futures[future])
+            if cancelled:
+                raise DownloadCancelled()
+            remaining = sorted(failed)
+        if self.progress:
+            for _ in remaining:
+                self.progress.page_finished(failed=True)
+        return sorted(saved_files)
+
+    def _revalidate_image(self, url: str, headers: dict, output_dir: str, idx: int, metadata, max_retries: int = 3, cancel_token=None) -> tuple[str, int]:
+        """
+        Checks one downloaded page with a conditional request. Returns the
+        outcome ('unchanged', 'refetched', 'repaired', 'unvalidated' or
+        'failed') and the number of bytes downloaded.
+        """
+        filename = self._page_filename(output_dir, idx, url)
+        name = os.path.basename(filename)
+        have_file = os.path.exists(filename)
+        if have_file:
+            try:
+                self._verify_image(filename)
+            except IncompleteDownloadError:
+                os.remove(filename)
+                have_file = False
+
+        request_headers = dict(headers)
+        if have_file:
+            validators = conditional_headers(metadata.get_page(name))
+            if not validators:
+                # The server sent no ETag/Last-Modified: a full download could not tell whether the page changed
+                return "unvalidated", 0
+            request_headers.update(validators)
+
+        for attempt in range(max_retries):
+            check_cancelled(cancel_token)
+            try:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                with self.transport.stream(url, request_headers, timeout=15) as img_res:
+                    if img_res.status_code == 304:
+                        return "unchanged", 0
+                    if not img_res.headers.get("Content-Type", "").startswith("image"):
+                        print(f"⚠️ Skipped non-image: {url}")
+                        return "failed", 0
+                    written = self._write_response(img_res, filename, cancel_token)
+                    metadata.set_page(name, url, img_res.headers, written)
+                return ("refetched" if have_file else "repaired"), written
+            except (*self.transport.errors, IncompleteDownloadError) as e:
+                print(f"❌ Error verifying {url} (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt < max_retries - 1:
+                    if cancel_token:
+                        cancel_token.sleep(5)
+                    else:
+                        time.sleep(5)
+        return "failed", 0
+
+    def _check_page(self, url: str, headers: dict, max_retries: int = 3, cancel_token=None) -> str:
+        """Sends a conditional request for a page and returns 'unchanged', 'stale' or 'failed', without downloading it."""
+        for attempt in range(max_retries):
+            check_cancelled(cancel_token)
+            try:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                # Leaving the block closes the response before its body is read
+                with self.transport.stream(url, headers, timeout=15) as img_res:
+                    return "unchanged" if img_res.status_code == 304 else "stale"
+            except self.transport.errors as e:
+                print(f"❌ Error verifying {url} (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt < max_retries - 1:
+                    if cancel_token:
+                        cancel_token.sleep(5)
+                    else:
+                        time.sleep(5)
+        return "failed"
+
+    def verify_pdf_pages(self, metadata_path: str, cancel_token=None) -> dict:
+        """
+        Checks whether the pages of a chapter that only exists as a PDF (its
+        images were deleted) have changed on the server, using the metadata
+        kept next to the PDF. Nothing is downloaded: changed pages are
+        reported as 'stale', meaning the chapter should be downloaded again.
+
+        Returns:
+            The number of pages per outcome ('unchanged', 'stale',
+            'unvalidated', 'failed').
+        """
+        metadata = MetadataFile(metadata_path)
+        headers = HEADERS.copy()
+        headers["User-Agent"] = metadata.get("user_agent") or headers.get("User-Agent", "")
+        headers["Referer"] = metadata.get("chapter_url", "")
+
+        summary = {"unchanged": 0, "stale": 0, "unvalidated": 0, "failed": 0}
+        checks = []
+        for idx, url in enumerate(metadata.get("image_urls") or [], start=1):
+            validators = conditional_headers(metadata.get_page(os.path.basename(self._page_filename("", idx, url))))
+            if validators:
+                checks.append((url, {**headers, **validators}))
+            else:
+                summary["unvalidated"] += 1
         with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {executor.submit(self._download_image, url, headers, output_dir, idx, total_images): url for idx, url in enumerate(image_urls, start=1)}
-            
-            for future in as_completed(futures):
-                try:
-                    future.result() # Re-raise exceptions from threads
-                except Exception as e:
-                    print(f"[bold red]Error in image download thread: {e}[/bold red]")
+            for outcome in executor.map(lambda check: self._check_page(*check, cancel_token=cancel_token), checks):
+                summary[outcome] += 1
+        return summary
+
+    def verify_images(self, output_dir: str, cancel_token=None) -> dict | None:
+        """
+        Revalidates a downloaded chapter against the server. Pages with stored
+        ETag/Last-Modified validators are checked with conditional requests, so
+        unchanged pages cost a 304 without a body; missing or corrupt pages are
+        downloaded again.
+
+        Args:
+            output_dir: A chapter directory written by download_images().
+            cancel_token: Optional CancelToken checked before each request and between chunks.
+
+        Returns:
+            The number of pages per outcome ('unchanged', 'refetched', 'repaired',
+            'unvalidated', 'failed') and the 'bytes' downloaded, or None if the
+            directory has no metadata to verify against.
+        """
+        metadata = MetadataFile(os.path.join(output_dir, METADATA_FILENAME))
+        image_urls = metadata.get("image_urls")
+        if not image_urls:
+            return None
+
+        headers = HEADERS.copy()
+        headers["User-Agent"] = metadata.get("user_agent") or headers.get("User-Agent", "")
+        headers["Referer"] = metadata.get("chapter_url", "")
+
+        summary = {"unchanged": 0, "refetched": 0, "repaired": 0, "unvalidated": 0, "failed": 0, "bytes": 0}
+        try:
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                futures = [executor.submit(self._revalidate_image, url, headers, output_dir, idx, metadata, cancel_token=cancel_token) for idx, url in enumerate(image_urls, start=1)]
+                for future in as_completed(futures):
+                    outcome, written = future.result()
+                    summary[outcome] += 1
+                    summary["bytes"] += written
+        finally:
+            metadata.save()
+        return summary
         
     def convert_to_pdf(self, image_folder: str, output_pdf_path: str):
         """
@@ -85,6 +361,11 @@ class Downloader:
             except IOError:
                 print(f"⚠️ Could not open {filename}, skipping.")
 
+        if images and self.page_layout:
+            page_count = len(images)
+            images = self.page_layout.apply(images)
+            print(f"✂️ Laid out {page_count} images as {len(images)} pages")
+
         if images:
             images[0].save(
                 output_pdf_path,
@@ -95,14 +376,23 @@ class Downloader:
             )
             print(f"✅ PDF saved to {output_pdf_path}")
 
-    def delete_images(self, image_folder: str):
+    def delete_images(self, image_folder: str, pdf_path: str | None = None):
         """
         Deletes all image files from a folder.
 
         Args:
             image_folder: The folder containing the images to delete.
+            pdf_path: The PDF the images were converted to. The page metadata
+                is moved next to it (see pdf_metadata_path), so `verify` can
+                still check the chapter; without it the metadata is deleted too.
         """
         for filename in os.listdir(image_folder):
+            path = os.path.join(image_folder, filename)
             if filename.endswith(('.png', '.jpg', '.jpeg')):
-                os.remove(os.path.join(image_folder, filename))
+                os.remove(path)
+            elif filename == METADATA_FILENAME:
+                if pdf_path:
+                    os.replace(path, pdf_metadata_path(pdf_path))
+                else:
+                    os.remove(path)
         print(f"🗑️ Deleted images from {image_folder}")
@@ -0,0 +1,160 @@
+# core/hosts.py
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+from .config import IMAGE_MIRRORS, HOST_EWMA_ALPHA, HOST_FAILURE_LIMIT, HOST_COOLDOWN_SECONDS, HOST_REPROBE_SECONDS
+
+def origin_of(url: str) -> str:
+    """'https://cdn.example/a/b.webp' -> 'https://cdn.example'"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+def with_origin(url: str, origin: str) -> str:
+    """Returns url with its scheme and host replaced by those of origin."""
+    parts, target = urlsplit(url), urlsplit(origin)
+    return urlunsplit((target.scheme, target.netloc, parts.path, parts.query, parts.fragment))
+
+class HostStats:
+    """Rolling statistics for one image host."""
+    def __init__(self):
+        self.latency = None # Moving average of seconds until the response headers arrive
+        self.error_rate = 0.0 # Moving average of failed requests (0 to 1)
+        self.failures_in_row = 0
+        self.resting_until = 0.0 # Not chosen before this time (monotonic) after repeated failures
+        self.last_checked = None # When a request last went to (or came back from) this host
+        self.requests = 0
+        self.errors = 0
+
+class HostSelector:
+    """
+    Keeps latency and error statistics for every image host and, for hosts
+    listed in a mirror group, sends each request to the fastest healthy host
+    of its group. URLs on hosts without mirrors are used as they are, but
+    their statistics are still kept.
+
+    A host is scored by its average latency, inflated by its error rate.
+    After HOST_FAILURE_LIMIT failures in a row it rests for
+    HOST_COOLDOWN_SECONDS, and a host that has not been measured for
+    HOST_REPROBE_SECONDS gets the next request, so a mirror that was slow or
+    down earlier is picked again once it recovers.
+    """
+    def __init__(self, mirrors=IMAGE_MIRRORS, alpha: float = HOST_EWMA_ALPHA, failure_limit: int = HOST_FAILURE_LIMIT,
+                 cooldown: float = HOST_COOLDOWN_SECONDS, reprobe_after: float = HOST_REPROBE_SECONDS):
+        self.groups = {} # origin -> tuple of the interchangeable origins it belongs to
+        for group in mirrors:
+            origins = tuple(origin_of(origin) for origin in group)
+            for origin in origins:
+                self.groups[origin] = origins
+        self.alpha = alpha
+        self.failure_limit = failure_limit
+        self.cooldown = cooldown
+        self.reprobe_after = reprobe_after
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def _stats(self, origin: str) -> HostStats:
+        if origin not in self.stats:
+            self.stats[origin] = HostStats()
+        return self.stats[origin]
+
+    def alternatives(self, url: str) -> tuple[str, ...]:
+        """The origins that can serve url, its own included."""
+        origin = origin_of(url)
+        return self.groups.get(origin, (origin,))
+
+    def choose(self, url: str, avoid=()) -> str:
+        """
+        Returns url rewritten to the best host of its mirror group. Hosts in
+        avoid (e.g. those that already failed for this page) are only used
+        when nothing else is left.
+        """
+        origins = self.alternatives(url)
+        if len(origins) == 1:
+            return url
+        now = time.monotonic()
+        with self.lock:
+            candidates = [origin for origin in origins if origin not in avoid] or list(origins)
+            healthy = [origin for origin in candidates if self._stats(origin).resting_until <= now]
+            if not healthy:
+                # Everything is resting: use the host that comes back first
+                best = min(candidates, key=lambda origin: self._stats(origin).resting_until)
+                return with_origin(url, best)
+            # Unmeasured or long-unused hosts are tried first; marking them checked sends only one request their way
+            stale = [origin for origin in healthy if self._stats(origin).last_checked is None or now - self._stats(origin).last_checked > self.reprobe_after]
+            if stale:
+                best = stale[0]
+                self._stats(best).last_checked = now
+            else:
+                best = min(healthy, key=self._score)
+        return with_origin(url, best)
+
+    def _score(self, origin: str) -> float:
+        stats = self._stats(origin)
+        if stats.latency is None:
+            return float("inf") # Its first request is still in flight or it has only failed
+        return stats.latency * (1 + 4 * stats.error_rate)
+
+    def record(self, url: str, latency: float | None):
+        """Records a request to url's host: the seconds until its response headers arrived, or None if it failed."""
+        now = time.monotonic()
+        with self.lock:
+            stats = self._stats(origin_of(url))
+            stats.requests += 1
+            stats.last_checked = now
+            failed = latency is None
+            stats.error_rate += self.alpha * (float(failed) - stats.error_rate)
+            if failed:
+                stats.errors += 1
+                stats.failures_in_row += 1
+                # Resting only matters for hosts with mirrors to use instead
+                if stats.failures_in_row >= self.failure_limit and origin_of(url) in self.groups:
+                    stats.resting_until = now + self.cooldown
+                    stats.failures_in_row = 0
+                    print(f"🌐 {origin_of(url)} keeps failing, resting it for {self.cooldown:.0f}s")
+            else:
+                stats.failures_in_row = 0
+                stats.latency = latency if stats.latency is None else stats.latency + self.alpha * (latency - stats.latency)
+
+    def probe(self, url: str, transport, headers: dict, timeout: float = 15):
+        """
+        Measures every not yet measured host of url's mirror group with one
+        request each, in parallel, so the first pages already go to the
+        fastest host. Only the response headers are waited for.
+        """
+        if len(self.alternatives(url)) == 1:
+            return
+        with self.lock:
+            origins = [origin for origin in self.alternatives(url) if self._stats(origin).last_checked is None]
+            for origin in origins:
+                self._stats(origin).last_checked = time.monotonic()
+
+        def measure(origin):
+            target = with_origin(url, origin)
+            start = time.monotonic()
+            try:
+                with transport.stream(target, headers, timeout=timeout) as response:
+                    healthy = response.headers.get("Content-Type", "").startswith("image")
+                    self.record(target, time.monotonic() - start if healthy else None)
+            except transport.errors:
+                self.record(target, None)
+
+        threads = [threading.Thread(target=measure, args=(origin,), daemon=True) for origin in origins]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def snapshot(self) -> dict:
+        """Per-host statistics: average latency, error rate, request and error counts, and whether it is resting."""
+        now = time.monotonic()
+        with self.lock:
+            return {
+                origin: {
+                    "latency": stats.latency,
+                    "error_rate": stats.error_rate,
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "resting": stats.resting_until > now,
+                }
+                for origin, stats in self.stats.items()
+            }
@@ -0,0 +1,193 @@
+# core/jobs.py
+import sqlite3
+import threading
+import time
+
+class JobQueue:
+    """
+    A persistent download job queue backed by SQLite, so queued and
+    interrupted jobs survive restarts of the daemon.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL,
+                    chapters TEXT,
+                    output TEXT,
+                    pdf INTEGER NOT NULL DEFAULT 0,
+                    delete_images INTEGER NOT NULL DEFAULT 0,
+                    threads INTEGER NOT NULL DEFAULT 10,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def submit(self, url: str, chapters: str | None = None, output: str | None = None, pdf: bool = False, delete_images: bool = False, threads: int = 10) -> int:
+        """Adds a new pending job and returns its id."""
+        now = time.time()
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO jobs (url, chapters, output, pdf, delete_images, threads, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'pending', ?, ?)",
+                (url, chapters, output, int(pdf), int(delete_images), threads, now, now)
+            )
+            return cursor.lastrowid
+
+    def claim_next(self) -> dict | None:
+        """Marks the oldest pending job as running and returns it, or None if the queue is empty."""
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT * FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?", (time.time(), row['id']))
+        job = dict(row)
+        job['status'] = 'running'
+        return job
+
+    def finish(self, job_id: int, error: str | None = None):
+        """Marks a job as done, or as failed if an error message is given."""
+        status = 'failed' if error else 'done'
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?", (status, error, time.time(), job_id))
+
+    def requeue_interrupted(self) -> int:
+        """Puts jobs left 'running' by a previous process back into the queue."""
+        with self.lock, self.conn:
+            cursor = self.conn.execute("UPDATE jobs SET status = 'pending', updated_at = ? WHERE status = 'running'", (time.time(),))
+            return cursor.rowcount
+
+    def get(self, job_id: int) -> dict | None:
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self) -> list[dict]:
+        with self.lock:
+            rows = self.conn.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class ChapterQueue:
+    """
+    A chapter-level work queue shared by several worker processes, on one
+    host or on several hosts sharing a filesystem. Workers claim chapters
+    under a time-limited lease and renew it with heartbeats; chapters whose
+    lease runs out (e.g. because the worker crashed) are handed out again.
+
+    The database uses SQLite's default rollback journal rather than WAL,
+    because WAL needs shared memory and does not work on network filesystems.
+    """
+    def __init__(self, db_path: str, max_attempts: int = 3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        # Autocommit mode, so that claims can use explicit BEGIN IMMEDIATE transactions
+        self.conn = sqlite3.connect(db_path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS chapter_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    url TEXT NOT NULL UNIQUE,
+                    output_dir TEXT NOT NULL,
+                    pdf INTEGER NOT NULL DEFAULT 0,
+                    delete_images INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    owner TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    bytes INTEGER,
+                    error TEXT
+                )
+            """)
+
+    def enqueue(self, chapters: list[dict], output_dir: str, pdf: bool = False, delete_images: bool = False) -> int:
+        """Adds chapters to the queue, skipping ones that are already queued. Returns the number added."""
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO chapter_jobs (title, url, output_dir, pdf, delete_images) VALUES (?, ?, ?, ?, ?)",
+                    [(chap['title'], chap['url'], output_dir, int(pdf), int(delete_images)) for chap in chapters]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            return self.conn.total_changes - before
+
+    def claim(self, worker_id: str, lease_seconds: float) -> dict | None:
+        """
+        Leases the next available chapter to a worker, first reclaiming
+        chapters whose lease has expired. Returns None if nothing is available.
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                reclaimed = self.conn.execute(
+                    "UPDATE chapter_jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                    "owner = NULL, lease_expires = NULL, error = 'lease expired' WHERE status = 'leased' AND lease_expires < ?",
+                    (self.max_attempts, now)
+                ).rowcount
+                row = self.conn.execute("SELECT * FROM chapter_jobs WHERE status = 'pending' ORDER BY id LIMIT 1").fetchone()
+                if row is not None:
+                    self.conn.execute(
+                        "UPDATE chapter_jobs SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                        (worker_id, now + lease_seconds, row['id'])
+                    )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        if reclaimed:
+            print(f"🔁 Reclaimed {reclaimed} chapter(s) with expired leases.")
+        return dict(row) if row else None
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """Extends a lease. Returns False if the worker no longer owns the chapter."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE chapter_jobs SET lease_expires = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+                (time.time() + lease_seconds, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, downloaded_bytes: int):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE chapter_jobs SET status = 'done', bytes = ?, error = NULL, lease_expires = NULL WHERE id = ? AND owner = ?",
+                (downloaded_bytes, job_id, worker_id)
+            )
+
+    def fail(self, job_id: int, worker_id: str, error: str):
+        """Releases a failed chapter for another attempt, or marks it failed after max_attempts."""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE chapter_jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "owner = NULL, lease_expires = NULL, error = ? WHERE id = ? AND owner = ?",
+                (self.max_attempts, error, job_id, worker_id)
+            )
+
+    def counts(self) -> dict[str, int]:
+        """Returns the number of chapters per status."""
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM chapter_jobs GROUP BY status").fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,113 @@
+# core/layout.py
+from .config import STRIP_PAGE_ASPECT, STRIP_MIN_ASPECT, STRIP_GUTTER_TOLERANCE
+
+class PageLayout:
+    """
+    Optional page-layout stage for convert_to_pdf. Chapters made of long
+    webtoon strips are stitched together and re-cut into pages of about
+    `page_aspect` (height / width), preferably inside whitespace gutters so
+    panels are not cut in half. Background-coloured margins and blank pages
+    are trimmed.
+
+    The analysis is done with NumPy on a grayscale copy of each image: a row
+    is a gutter when its brightness varies by at most `tolerance`, and a
+    margin when it stays within `tolerance` of the page's corner pixel. Both
+    are contiguous 2-D uint8 reductions, and row flags are computed once per
+    image and carried along with its leftover rows.
+    """
+    def __init__(self, page_aspect: float = STRIP_PAGE_ASPECT, min_strip_aspect: float = STRIP_MIN_ASPECT,
+                 tolerance: int = STRIP_GUTTER_TOLERANCE, trim: bool = True):
+        self.page_aspect = page_aspect
+        self.min_strip_aspect = min_strip_aspect # Images at least this tall (height / width) count as strips
+        self.tolerance = tolerance
+        self.trim = trim
+        # A cut is looked for between these fractions of the target page height
+        self.min_ratio = 0.6
+        self.max_ratio = 1.3
+
+    def apply(self, images: list) -> list:
+        """Returns the pages to put in the PDF for a chapter's RGB images."""
+        import numpy as np
+        from PIL import Image
+
+        if not any(image.height / image.width >= self.min_strip_aspect for image in images):
+            # Not a webtoon chapter: keep its pages, only trimming margins
+            if not self.trim:
+                return images
+            pages = [self._trim(np.asarray(image)) for image in images]
+            return [Image.fromarray(page) for page in pages if page is not None]
+
+        pages = []
+        carry, carry_flags = None, None # Bottom of the strip that has not become a page yet, and its row flags
+        for image in images:
+            array = np.asarray(image)
+            flags = self._uniform_rows(image) # Computed once per image and carried along with its leftover rows
+            if carry is not None and carry.shape[1] != array.shape[1]:
+                pages.append(carry) # Different width, so it cannot be stitched to what follows
+                carry, carry_flags = None, None
+            if carry is not None:
+                flags = np.concatenate([carry_flags, flags])
+            carry, carry_flags = self._cut_pages(carry, array, flags, pages)
+        if carry is not None and len(carry):
+            pages.append(carry)
+
+        if self.trim:
+            pages = [self._trim(page) for page in pages]
+        return [Image.fromarray(page) for page in pages if page is not None]
+
+    @staticmethod
+    def _gray(image):
+        """A contiguous 2-D brightness array; PIL's conversion is much faster than reducing over RGB channels."""
+        import numpy as np
+        from PIL import Image
+
+        if not isinstance(image, Image.Image):
+            image = Image.fromarray(image)
+        return np.asarray(image.convert("L"))
+
+    def _uniform_rows(self, image):
+        """True for each row whose brightness varies by at most the tolerance."""
+        gray = self._gray(image)
+        return gray.max(axis=1) - gray.min(axis=1) <= self.tolerance
+
+    def _cut_pages(self, carry, array, flags, pages: list):
+        """
+        Cuts as many pages as fit off the top of carry + array (without
+        concatenating them) and returns the rest with its row flags.
+        """
+        import numpy as np
+
+        carried = 0 if carry is None else len(carry)
+        height = carried + len(array)
+
+        def rows(start, end):
+            # A view of one image where possible; only pages straddling the seam are copied
+            if start >= carried:
+                return array[start - carried:end - carried]
+            if end <= carried:
+                return carry[start:end]
+            return np.concatenate([carry[start:], array[:end - carried]])
+
+        target = int(array.shape[1] * self.page_aspect)
+        pos = 0
+        while height - pos > target * self.max_ratio:
+            low, high, ideal = pos + int(target * self.min_ratio), pos + int(target * self.max_ratio), pos + target
+            gutters = np.flatnonzero(flags[low:high]) + low
+            cut = int(gutters[np.abs(gutters - ideal).argmin()]) if len(gutters) else ideal # No gutter: cut at the target height
+            pages.append(rows(pos, cut))
+            pos = cut
+        return rows(pos, height), flags[pos:]
+
+    def _trim(self, page):
+        """Removes margins of the background colour around the content; None if the page is blank."""
+        import numpy as np
+
+        # The top-left pixel is taken as the background colour
+        gray = self._gray(page)
+        background = gray[0, 0]
+        content = (np.maximum(gray, background) - np.minimum(gray, background)) > self.tolerance # |gray - background| in uint8
+        content_rows = np.flatnonzero(content.any(axis=1))
+        if not len(content_rows):
+            return None
+        content_cols = np.flatnonzero(content[content_rows[0]:content_rows[-1] + 1].any(axis=0))
+        return page[content_rows[0]:content_rows[-1] + 1, content_cols[0]:content_cols[-1] + 1]
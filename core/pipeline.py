@@ -0,0 +1,168 @@
+# core/pipeline.py
+import queue
+import threading
+import traceback
+from .cancel import CancelToken, DownloadCancelled
+from .tasks import scrape_chapter, download_chapter_images, package_chapter
+
+_DONE = object() # Sentinel telling a stage's workers that the stage in front of it has finished
+
+class ChapterPipeline:
+    """
+    Runs chapters through three stages, scrape -> download -> package, each
+    with its own number of workers and connected by bounded queues. While
+    chapter N is downloading, chapter N+1 can be scraped and chapter N-1
+    packaged, and a full queue makes the stage in front of it wait instead
+    of piling up work (backpressure).
+    """
+    def __init__(self, scraper, downloader, base_output_dir: str, convert_to_pdf: bool, delete_images_after_pdf: bool,
+                 scrape_workers: int = 2, download_workers: int = 4, package_workers: int = 2, queue_size: int = 4,
+                 log=print, on_update=None, cancel_token=None):
+        self.scraper = scraper
+        self.downloader = downloader
+        self.base_output_dir = base_output_dir
+        self.convert_to_pdf = convert_to_pdf
+        self.delete_images_after_pdf = delete_images_after_pdf
+        self.workers = {"scrape": scrape_workers, "download": download_workers, "package": package_workers if convert_to_pdf else 0}
+        self.queue_size = queue_size
+        self.log = log
+        self.on_update = on_update # Called with the output of stats() whenever a chapter moves between stages
+        self.cancel_token = cancel_token or CancelToken()
+
+        self.stats_lock = threading.Lock()
+        self.active = {"scrape": 0, "download": 0, "package": 0}
+        self.results = [] # (chapter, downloaded bytes or None, exception or None)
+
+    def run(self, chapters: list[dict]) -> list[tuple[dict, int | None, Exception | None]]:
+        """
+        Processes all chapters and waits for them to finish.
+
+        Returns:
+            A list of (chapter, downloaded bytes, exception) tuples; bytes is
+            None for chapters that failed or had no images.
+        """
+        self.inputs = queue.Queue()
+        self.to_download = queue.Queue(maxsize=self.queue_size)
+        self.to_package = queue.Queue(maxsize=self.queue_size)
+        for chapter in chapters:
+            self.inputs.put(chapter)
+
+        stages = [
+            ("scrape", self.inputs, self._scrape, self.to_download),
+            ("download", self.to_download, self._download, self.to_package if self.workers["package"] else None),
+        ]
+        if self.workers["package"]:
+            stages.append(("package", self.to_package, self._package, None))
+
+        threads = []
+        for name, source, handler, target in stages:
+            remaining = [self.workers[name]]
+            for i in range(self.workers[name]):
+                thread = threading.Thread(target=self._stage_loop, args=(name, source, handler, target, remaining), name=f"{name}-{i}", daemon=True)
+                threads.append(thread)
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+        return self.results
+
+    def stats(self) -> dict:
+        """Returns per-stage queue depths and active worker counts."""
+        with self.stats_lock:
+            active = dict(self.active)
+        return {
+            "scrape_queue": self.inputs.qsize(),
+            "download_queue": self.to_download.qsize(),
+            "package_queue": self.to_package.qsize(),
+            "active": active,
+            "finished": len(self.results),
+        }
+
+    def _put(self, target, item) -> bool:
+        """Puts an item on a bounded queue, giving up if the run is cancelled while waiting."""
+        while not self.cancel_token.cancelled:
+            try:
+                target.put(item, timeout=0.25) # Blocks while the next stage is backed up
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _stage_loop(self, name, source, handler, target, remaining):
+        while not self.cancel_token.cancelled:
+            if source is self.inputs:
+                # All chapters are queued up front, so an empty input queue means the scrape stage is done
+                try:
+                    item = source.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                try:
+                    item = source.get(timeout=0.25)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+            with self.stats_lock:
+                self.active[name] += 1
+            try:
+                self.cancel_token.check() # Waits here while paused
+                output = handler(item)
+            except DownloadCancelled as e:
+                self._finish(item if name == "scrape" else item[0], None, e)
+                output = None
+            except Exception as e:
+                chapter = item if name == "scrape" else item[0]
+                self.log(f"❌ {name.capitalize()} failed for {chapter['title']}: {e}")
+                self.log(traceback.format_exc())
+                self._finish(chapter, None, e)
+                output = None
+            finally:
+                with self.stats_lock:
+                    self.active[name] -= 1
+
+            if output is not None:
+                if target is not None:
+                    self._put(target, output)
+                else:
+                    self._finish(output[0], output[1], None)
+            self._notify()
+
+        # The last worker of this stage to finish tells every worker of the next stage to stop
+        with self.stats_lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and target is not None:
+            next_stage = "download" if name == "scrape" else "package"
+            for _ in range(self.workers[next_stage]):
+                self._put(target, _DONE)
+
+    def _scrape(self, chapter):
+        self.log(f"🔎 Scraping {chapter['title']}")
+        image_urls, user_agent, block_stats = scrape_chapter(self.scraper, chapter, self.cancel_token)
+        if not image_urls:
+            self.log(f"❌ Could not find any images for {chapter['title']}.")
+            self._finish(chapter, None, None)
+            return None
+        return (chapter, image_urls, user_agent, block_stats)
+
+    def _download(self, item):
+        chapter, image_urls, user_agent, block_stats = item
+        self.log(f"⬇️ Downloading {chapter['title']} ({len(image_urls)} images)")
+        downloaded_bytes = download_chapter_images(self.downloader, chapter, self.base_output_dir, image_urls, user_agent, block_stats, self.log, self.cancel_token)
+        return (chapter, downloaded_bytes)
+
+    def _package(self, item):
+        chapter, downloaded_bytes = item
+        self.log(f"📦 Packaging {chapter['title']}")
+        package_chapter(self.downloader, chapter, self.base_output_dir, self.delete_images_after_pdf, self.log, self.cancel_token)
+        return (chapter, downloaded_bytes)
+
+    def _finish(self, chapter, downloaded_bytes, error):
+        with self.stats_lock:
+            self.results.append((chapter, downloaded_bytes, error))
+
+    def _notify(self):
+        if self.on_update:
+            self.on_update(self.stats())
@@ -0,0 +1,111 @@
+# core/prefetch.py
+import threading
+import time
+import traceback
+from .cancel import CancelToken, DownloadCancelled, check_cancelled
+from .config import PREFETCH_BUDGET, PREFETCH_TTL_SECONDS
+
+class ImageUrlPrefetcher:
+    """
+    Resolves image URL lists in the background for chapters the user is
+    likely to download (the newest ones, or the ones currently selected),
+    one at a time, so a download can start fetching images right away.
+
+    It wraps a scraper or ScraperPool and has the same fetch_image_urls() /
+    pop_block_stats() interface, so it can be passed wherever those are
+    used: prefetched chapters are answered from the cache, a chapter that is
+    being prefetched right now is waited for, and anything else goes
+    straight to the wrapped source.
+    """
+    def __init__(self, image_source, budget: int = PREFETCH_BUDGET, ttl: float = PREFETCH_TTL_SECONDS):
+        self.image_source = image_source
+        self.budget = budget # Most chapters prefetched (and kept) at a time
+        self.ttl = ttl # Seconds a prefetched list is trusted; image URLs may expire
+
+        self.condition = threading.Condition()
+        self.targets = [] # Chapter URLs still to prefetch, most likely first
+        self.cache = {} # chapter URL -> (time resolved, (image_urls, user_agent))
+        self.current = None # (chapter URL, CancelToken) being prefetched
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self.thread.start()
+
+    def prefetch(self, chapters: list[dict]):
+        """
+        Replaces the chapters to prefetch. Only the first `budget` are used;
+        cached lists for other chapters are dropped and an in-flight prefetch
+        for a chapter that is no longer wanted is cancelled.
+        """
+        urls = [chapter['url'] for chapter in chapters[:self.budget]]
+        with self.condition:
+            self.cache = {url: entry for url, entry in self.cache.items() if url in urls}
+            self.targets = [url for url in urls if url not in self.cache]
+            if self.current and self.current[0] not in urls:
+                self.current[1].cancel()
+            self.condition.notify_all()
+
+    def hold(self, keep_urls=()):
+        """Stops prefetching more chapters; an in-flight one is only finished if its URL is in keep_urls."""
+        with self.condition:
+            self.targets = []
+            if self.current and self.current[0] not in keep_urls:
+                self.current[1].cancel()
+
+    def fetch_image_urls(self, chapter_url: str, cancel_token=None) -> tuple[list[str], str]:
+        """Same as ComickScraper.fetch_image_urls, answered from the prefetch cache when possible."""
+        while True:
+            with self.condition:
+                if chapter_url in self.targets:
+                    self.targets.remove(chapter_url) # We are about to resolve it ourselves
+                if not (self.current and self.current[0] == chapter_url):
+                    entry = self.cache.pop(chapter_url, None)
+                    break
+                self.condition.wait(timeout=0.25)
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise DownloadCancelled()
+            # A paused download waits here, not while holding the lock prefetch() and hold() need
+            check_cancelled(cancel_token)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            print(f"⚡ Using prefetched image list for {chapter_url}")
+            return entry[1]
+        return self.image_source.fetch_image_urls(chapter_url, cancel_token=cancel_token)
+
+    def pop_block_stats(self, chapter_url: str) -> dict | None:
+        pop_block_stats = getattr(self.image_source, "pop_block_stats", None)
+        return pop_block_stats(chapter_url) if pop_block_stats else None
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.closed and not self.targets:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                chapter_url = self.targets.pop(0)
+                token = CancelToken()
+                self.current = (chapter_url, token)
+
+            result = None
+            try:
+                result = self.image_source.fetch_image_urls(chapter_url, cancel_token=token)
+            except DownloadCancelled:
+                pass
+            except Exception as e:
+                print(f"⚠️ Prefetching {chapter_url} failed: {e}")
+                traceback.print_exc()
+
+            with self.condition:
+                if result and result[0] and not token.cancelled:
+                    self.cache[chapter_url] = (time.monotonic(), result)
+                self.current = None
+                self.condition.notify_all()
+
+    def close(self):
+        """Cancels any prefetch in flight and stops the background thread."""
+        with self.condition:
+            self.closed = True
+            self.targets = []
+            if self.current:
+                self.current[1].cancel()
+            self.condition.notify_all()
+        self.thread.join(timeout=5)
@@ -0,0 +1,120 @@
+# core/progress.py
+import collections
+import threading
+import time
+
+class TransferProgress:
+    """
+    Page and byte counters for a download run, updated by the Downloader's
+    threads for every chunk and page. Instead of passing each update on,
+    a reporting thread calls on_update with a snapshot at a fixed rate, so
+    a fast download cannot flood a UI event loop with events.
+
+    Snapshots are dicts with pages_done, pages_failed, pages_total,
+    bytes_done, bytes_per_second, pages_per_second, eta (seconds or None)
+    and elapsed.
+    """
+    def __init__(self, on_update, interval: float = 0.25, chapters_total: int | None = None, window: float = 5.0):
+        self.on_update = on_update
+        self.interval = interval
+        self.chapters_total = chapters_total # Used to estimate pages of chapters not scraped yet
+        self.window = window # Seconds of history the rates are averaged over
+
+        self.lock = threading.Lock()
+        self.pages_done = 0
+        self.pages_failed = 0
+        self.pages_total = 0
+        self.chapters_seen = 0
+        self.bytes_done = 0
+        self.started = time.monotonic()
+        self.samples = collections.deque() # (time, bytes_done, pages_done)
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def add_chapter(self, page_count: int):
+        """Called when a chapter's page count becomes known."""
+        with self.lock:
+            self.chapters_seen += 1
+            self.pages_total += page_count
+
+    def add_bytes(self, count: int):
+        with self.lock:
+            self.bytes_done += count
+
+    def page_finished(self, failed: bool = False):
+        with self.lock:
+            if failed:
+                self.pages_failed += 1
+            else:
+                self.pages_done += 1
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self.lock:
+            pages_done, pages_failed, pages_total = self.pages_done, self.pages_failed, self.pages_total
+            bytes_done, chapters_seen = self.bytes_done, self.chapters_seen
+            self.samples.append((now, bytes_done, pages_done))
+            while len(self.samples) > 2 and now - self.samples[0][0] > self.window:
+                self.samples.popleft()
+            first_time, first_bytes, first_pages = self.samples[0]
+
+        span = now - first_time
+        bytes_per_second = (bytes_done - first_bytes) / span if span > 0 else 0.0
+        pages_per_second = (pages_done - first_pages) / span if span > 0 else 0.0
+
+        expected_pages = pages_total
+        if self.chapters_total and chapters_seen and chapters_seen < self.chapters_total:
+            expected_pages += (self.chapters_total - chapters_seen) * pages_total / chapters_seen
+        pages_left = max(expected_pages - pages_done - pages_failed, 0)
+        eta = pages_left / pages_per_second if pages_per_second > 0 else None
+
+        return {
+            "pages_done": pages_done,
+            "pages_failed": pages_failed,
+            "pages_total": pages_total,
+            "bytes_done": bytes_done,
+            "bytes_per_second": bytes_per_second,
+            "pages_per_second": pages_per_second,
+            "eta": eta,
+            "elapsed": now - self.started,
+        }
+
+    def start(self):
+        """Starts reporting snapshots every interval seconds."""
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._report, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stops reporting and sends one final snapshot."""
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.on_update(self.snapshot())
+
+    def _report(self):
+        while not self.stopped.wait(self.interval):
+            self.on_update(self.snapshot())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def format_size(num_bytes: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1000 or unit == "GB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1000
+
+def format_transfer(snapshot: dict) -> str:
+    """One-line summary of a TransferProgress snapshot, e.g. for a status bar."""
+    eta = snapshot["eta"]
+    eta_text = time.strftime("%H:%M:%S", time.gmtime(eta)) if eta is not None else "--:--:--"
+    return (
+        f"{snapshot['pages_done']}/{snapshot['pages_total']} pages • {format_size(snapshot['bytes_done'])} • "
+        f"{format_size(snapshot['bytes_per_second'])}/s • {snapshot['pages_per_second']:.1f} pages/s • ETA {eta_text}"
+    )
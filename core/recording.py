@@ -0,0 +1,104 @@
+# core/recording.py
+import base64
+import hashlib
+import json
+import os
+import re
+import requests
+from requests.structures import CaseInsensitiveDict
+
+class ReplayMissError(requests.exceptions.ConnectionError):
+    """Raised in replay mode for a request that was not recorded (there is no network to fall back to)."""
+
+class SessionRecording:
+    """
+    Records everything ComickScraper fetches to a directory, or serves it
+    back from there, so scrapes can be repeated and timed offline.
+
+    Each scrape (a chapter page, a manga's chapter list, a search) keeps the
+    browser's traffic in its own HAR file, recorded and replayed by
+    Playwright's route_from_har. The cloudscraper requests made before the
+    browser starts are stored as JSON, together with the cookies and
+    User-Agent they produced:
+
+        <directory>/browser/<key>.har
+        <directory>/http/<key>.json
+
+    where <key> is derived from the URL being scraped. In replay mode nothing
+    goes to the network: unrecorded requests fail with ReplayMissError (or
+    are aborted, inside the browser).
+    """
+    def __init__(self, directory: str, replay: bool = False):
+        self.directory = directory
+        self.replay = replay
+
+    @staticmethod
+    def _key(url: str) -> str:
+        """A file name for url: a readable slug plus a hash, so different query strings do not collide."""
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", url.split("://", 1)[-1]).strip("-")[:80]
+        return f"{slug}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]}"
+
+    def har_path(self, url: str) -> str:
+        return os.path.join(self.directory, "browser", f"{self._key(url)}.har")
+
+    def _response_path(self, url: str) -> str:
+        return os.path.join(self.directory, "http", f"{self._key(url)}.json")
+
+    def attach(self, context, url: str):
+        """
+        Records or replays the traffic of a browser context used to scrape url.
+        Call it before any other route is added to the context. A recorded HAR
+        is written when the context is closed.
+        """
+        path = self.har_path(url)
+        if self.replay:
+            if not os.path.exists(path):
+                raise ReplayMissError(f"No browser recording for {url} in {self.directory}")
+            context.route_from_har(path, not_found="abort")
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            context.route_from_har(path, update=True, update_content="embed")
+
+    def get(self, session, url: str, **kwargs) -> requests.Response:
+        """session.get(url), recorded to or answered from the recording directory."""
+        path = self._response_path(url)
+        if self.replay:
+            return self._replay_response(session, url, path)
+
+        response = session.get(url, **kwargs)
+        entry = {
+            "url": url,
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "content": base64.b64encode(response.content).decode("ascii"),
+            "cookies": session.cookies.get_dict(),
+            "user_agent": session.headers.get("User-Agent", ""),
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.part"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(temp_path, path)
+        return response
+
+    def _replay_response(self, session, url: str, path: str) -> requests.Response:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            raise ReplayMissError(f"No recorded response for {url} in {self.directory}") from None
+
+        # Restore what the live request would have left on the session
+        requests.utils.add_dict_to_cookiejar(session.cookies, entry["cookies"])
+        if entry["user_agent"]:
+            session.headers["User-Agent"] = entry["user_agent"]
+
+        response = requests.Response()
+        response.url = entry["url"]
+        response.status_code = entry["status_code"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = base64.b64decode(entry["content"])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
@@ -0,0 +1,67 @@
+# core/scheduler.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import zip_longest
+
+class RateLimiter:
+    """
+    A thread-safe token bucket. Each call to acquire() takes one token and
+    blocks until one is available, so callers share one global request rate.
+    """
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def interleave(groups: dict[str, list]) -> list[tuple[str, object]]:
+    """
+    Orders the items of several groups round-robin, so that no group has to
+    wait for another one to finish before its first item is started.
+
+    Returns:
+        A list of (group key, item) tuples.
+    """
+    columns = [[(key, item) for item in items] for key, items in groups.items()]
+    return [entry for row in zip_longest(*columns) for entry in row if entry is not None]
+
+class FairScheduler:
+    """
+    Runs tasks from several groups (e.g. one group per series) under one
+    shared concurrency budget, interleaving the groups fairly.
+    """
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+
+    def run(self, groups: dict[str, list], fn) -> dict[str, list[tuple[object, object, Exception | None]]]:
+        """
+        Calls fn(group_key, item) for every item of every group.
+
+        Returns:
+            A dictionary mapping each group key to a list of
+            (item, result, exception) tuples in completion order.
+        """
+        results = {key: [] for key in groups}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(fn, key, item): (key, item) for key, item in interleave(groups)}
+            for future in as_completed(futures):
+                key, item = futures[future]
+                try:
+                    results[key].append((item, future.result(), None))
+                except Exception as e:
+                    results[key].append((item, None, e))
+        return results
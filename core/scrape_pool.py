@@ -0,0 +1,214 @@
+# core/scrape_pool.py
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+from .cancel import CancelToken, DownloadCancelled, check_cancelled
+
+class _CancelledRequestFlag:
+    """
+    Event-like view, inside a scraping process, of "the parent cancelled the
+    request with this id". Lets the process wrap it in a CancelToken.
+    """
+    def __init__(self, cancelled_request, request_id: int):
+        self.cancelled_request = cancelled_request # multiprocessing.Value shared with the parent
+        self.request_id = request_id
+
+    def is_set(self) -> bool:
+        return self.cancelled_request.value == self.request_id
+
+    def set(self):
+        self.cancelled_request.value = self.request_id
+
+    def wait(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_set():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+def _scrape_worker_main(index: int, tasks, results, cancelled_request, recording=None):
+    """Entry point of a scraping process: owns one browser and serves chapter URLs until told to stop."""
+    from core.scraper import ComickScraper
+
+    scraper = ComickScraper(recording=recording)
+    try:
+        scraper.start_browser()
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            request_id, chapter_url = task
+            cancel_token = CancelToken(cancel_event=_CancelledRequestFlag(cancelled_request, request_id))
+            try:
+                result = scraper.fetch_image_urls(chapter_url, cancel_token=cancel_token)
+            except DownloadCancelled:
+                result = ([], "")
+            except Exception as e:
+                print(f"❌ Scraping process {index} failed on {chapter_url}: {e}")
+                traceback.print_exc()
+                result = ([], "")
+            results.put((index, request_id, (result, scraper.pop_block_stats(chapter_url))))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scraper.close()
+
+class ScraperPool:
+    """
+    A small pool of scraping processes, each owning one long-lived browser.
+    Chapter URLs are sent to the processes over IPC queues and the image URL
+    lists come back the same way, so scraping runs on several cores and a
+    crashing browser cannot take the downloader down with it.
+
+    fetch_image_urls() has the same signature as ComickScraper's, so a pool
+    can be passed anywhere a scraper is only used to resolve image URLs.
+    It is safe to call from many threads at once.
+    """
+    def __init__(self, processes: int = 2, max_restarts: int = 3, recording=None):
+        self.context = multiprocessing.get_context("spawn")
+        self.results = self.context.Queue()
+        self.requests = queue.Queue() # (request id, chapter URL) waiting for an idle process
+        self.request_ids = itertools.count()
+        self.pending = {} # request id -> [Event, (result, block stats)]
+        self.block_stats = {} # chapter URL -> stats reported by the scraping process
+        self.lock = threading.Lock()
+        self.max_restarts = max_restarts
+        self.recording = recording # SessionRecording handed to every scraping process
+        self.stopping = threading.Event()
+
+        # Each process gets its own task queue, so we always know which request it is working on
+        self.task_queues = [self.context.Queue() for _ in range(processes)]
+        self.cancelled_requests = [self.context.Value('q', -1) for _ in range(processes)]
+        self.processes = [self._spawn(index) for index in range(processes)]
+        self.assigned = [None] * processes # request id each process is working on
+        self.restarts = [0] * processes # consecutive restarts, reset after a successful request
+
+        self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self.dispatcher.start()
+
+    def _spawn(self, index: int):
+        process = self.context.Process(target=_scrape_worker_main, args=(index, self.task_queues[index], self.results, self.cancelled_requests[index], self.recording), daemon=True)
+        process.start()
+        return process
+
+    def fetch_image_urls(self, chapter_url: str, cancel_token=None) -> tuple[list[str], str]:
+        """
+        Resolves a chapter's image URLs in one of the scraping processes.
+        If the optional CancelToken is cancelled, the request is withdrawn
+        (or the process told to stop working on it) and DownloadCancelled is raised.
+        """
+        if self.stopping.is_set():
+            raise RuntimeError("ScraperPool is closed")
+        check_cancelled(cancel_token)
+        done = threading.Event()
+        with self.lock:
+            request_id = next(self.request_ids)
+            self.pending[request_id] = [done, (([], ""), None)]
+        self.requests.put((request_id, chapter_url))
+        while not done.wait(timeout=0.25 if cancel_token else None):
+            if cancel_token.cancelled:
+                self._abandon(request_id)
+                raise DownloadCancelled()
+        with self.lock:
+            result, block_stats = self.pending.pop(request_id)[1]
+            if block_stats is not None:
+                self.block_stats[chapter_url] = block_stats
+        return result
+
+    def pop_block_stats(self, chapter_url: str) -> dict | None:
+        """Same as ComickScraper.pop_block_stats, for chapters scraped by the pool."""
+        with self.lock:
+            return self.block_stats.pop(chapter_url, None)
+
+    def _abandon(self, request_id: int):
+        with self.lock:
+            self.pending.pop(request_id, None)
+        for index, assigned_id in enumerate(self.assigned):
+            if assigned_id == request_id:
+                self.cancelled_requests[index].value = request_id
+
+    def _resolve(self, request_id: int, result):
+        with self.lock:
+            entry = self.pending.get(request_id)
+        if entry:
+            entry[1] = result
+            entry[0].set()
+
+    def _dispatch(self):
+        """Hands queued requests to idle processes and collects their results."""
+        while not self.stopping.is_set():
+            for index, process in enumerate(self.processes):
+                if process is None or self.assigned[index] is not None:
+                    continue
+                try:
+                    while True:
+                        request_id, chapter_url = self.requests.get_nowait()
+                        with self.lock:
+                            if request_id in self.pending:
+                                break # Skip requests that were cancelled while queued
+                except queue.Empty:
+                    break
+                self.assigned[index] = request_id
+                self.task_queues[index].put((request_id, chapter_url))
+
+            try:
+                index, request_id, result = self.results.get(timeout=0.5)
+            except queue.Empty:
+                self._replace_dead_processes()
+                continue
+            self.assigned[index] = None
+            self.restarts[index] = 0
+            self._resolve(request_id, result)
+
+    def _replace_dead_processes(self):
+        for index, process in enumerate(self.processes):
+            if process is None or process.is_alive() or self.stopping.is_set():
+                continue
+            if self.assigned[index] is not None:
+                self._resolve(self.assigned[index], (([], ""), None))
+                self.assigned[index] = None
+            if self.restarts[index] >= self.max_restarts:
+                print(f"❌ Scraping process {index} keeps exiting (code {process.exitcode}). Giving up on it.")
+                self.processes[index] = None
+                continue
+            print(f"⚠️ Scraping process {index} exited unexpectedly (code {process.exitcode}). Restarting it.")
+            self.restarts[index] += 1
+            self.task_queues[index] = self.context.Queue()
+            self.cancelled_requests[index] = self.context.Value('q', -1)
+            self.processes[index] = self._spawn(index)
+
+        if all(process is None for process in self.processes):
+            print("❌ No scraping processes left. Failing all pending chapters.")
+            self.stopping.set()
+            self._release_waiters()
+
+    def _release_waiters(self):
+        # Anything still waiting gets an empty result rather than hanging forever
+        with self.lock:
+            for entry in self.pending.values():
+                entry[0].set()
+
+    def close(self):
+        """Stops all scraping processes and their browsers."""
+        if self.stopping.is_set() and not self.dispatcher.is_alive():
+            return
+        self.stopping.set()
+        self.dispatcher.join()
+        processes = [(index, process) for index, process in enumerate(self.processes) if process is not None]
+        for index, _ in processes:
+            self.task_queues[index].put(None)
+        for _, process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self._release_waiters()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
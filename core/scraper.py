@@ -1,33 +1,179 @@
 # core/scraper.py
+import os
 import re
+import threading
+import time
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
 import cloudscraper
 import requests
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
-from .config import HEADERS, BASE_URL
+from .cancel import DownloadCancelled, check_cancelled
+from .recording import ReplayMissError
+from .validators import MetadataFile, conditional_headers, validators_from
+from .config import SERIES_METADATA_FILENAME, HEADERS, BASE_URL, SCRAPER_BLOCK_RESOURCES, SCRAPER_BLOCKED_RESOURCE_TYPES, SCRAPER_FIRST_PARTY_HOSTS, SCRAPER_RESOURCE_ALLOWLIST
 
 class ComickScraper:
     """
     Handles scraping logic for Comick.io, including bypassing Cloudflare
     and extracting image URLs from a chapter page.
     """
-    def __init__(self):
+    def __init__(self, block_resources: bool = SCRAPER_BLOCK_RESOURCES, recording=None):
         self.scraper = cloudscraper.create_scraper(browser='chrome')
-
-    def fetch_image_urls(self, chapter_url: str) -> tuple[list[str], str]:
+        self.block_resources = block_resources
+        # Optional SessionRecording that records all traffic to, or replays it from, a directory
+        self.recording = recording
+        self.block_stats = {} # chapter URL -> requests blocked while scraping it, see pop_block_stats()
+        self.block_stats_lock = threading.Lock()
+        # Optional long-lived browser for fetch_image_urls, see start_browser()
+        self.playwright = None
+        self.browser = None
+
+    def _get(self, url: str, **kwargs):
+        """self.scraper.get(), going through the recording if there is one."""
+        if self.recording:
+            return self.recording.get(self.scraper, url, **kwargs)
+        return self.scraper.get(url, **kwargs)
+
+    def _launch(self, playwright, headless: bool):
+        # A replayed session does not meet Cloudflare, so it never needs a visible browser (e.g. in CI)
+        return playwright.chromium.launch(headless=headless or bool(self.recording and self.recording.replay))
+
+    def _new_context(self, browser, scrape_url: str, **options):
+        """A browser context whose traffic is recorded or replayed under scrape_url, if there is a recording."""
+        context = browser.new_context(**options)
+        if self.recording:
+            try:
+                self.recording.attach(context, scrape_url)
+            except BaseException:
+                context.close()
+                raise
+        return context
+
+    def start_browser(self):
+        """
+        Launches one headless browser that is reused by fetch_image_urls
+        instead of launching a new one per chapter. Playwright's sync API is
+        bound to the calling thread, so only use this from a single thread
+        (e.g. a dedicated scraping process, see core/scrape_pool.py).
+        """
+        if self.browser is None:
+            self.playwright = sync_playwright().start()
+            self.browser = self._launch(self.playwright, headless=True)
+
+    def close(self):
+        """Closes the long-lived browser, if one was started."""
+        if self.browser is not None:
+            self.browser.close()
+            self.browser = None
+        if self.playwright is not None:
+            self.playwright.stop()
+            self.playwright = None
+
+    def pop_block_stats(self, chapter_url: str) -> dict | None:
+        """
+        Returns and forgets the requests blocked while scraping a chapter, as a
+        dictionary with the total 'requests', a count per resource type in
+        'by_type' and the blocked 'urls'. None if nothing was recorded.
+        """
+        with self.block_stats_lock:
+            return self.block_stats.pop(chapter_url, None)
+
+    @staticmethod
+    def _matches_host(host: str, domains) -> bool:
+        return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+    def _should_block(self, resource_type: str, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        if self._matches_host(host, SCRAPER_RESOURCE_ALLOWLIST):
+            return False
+        if resource_type in SCRAPER_BLOCKED_RESOURCE_TYPES:
+            return True
+        return resource_type == "script" and not self._matches_host(host, SCRAPER_FIRST_PARTY_HOSTS)
+
+    def _block_resources(self, context) -> dict:
+        """Aborts unneeded requests in a browser context and returns the (live) statistics about them."""
+        stats = {"requests": 0, "by_type": {}, "urls": []}
+
+        def handle(route):
+            request = route.request
+            if self._should_block(request.resource_type, request.url):
+                stats["requests"] += 1
+                stats["by_type"][request.resource_type] = stats["by_type"].get(request.resource_type, 0) + 1
+                stats["urls"].append(request.url)
+                route.abort()
+            else:
+                route.fallback() # On to the recording's route, if any, or the network
+
+        context.route("**/*", handle)
+        return stats
+
+    @staticmethod
+    def _wait(page, milliseconds: int, cancel_token=None):
+        """page.wait_for_timeout() that returns early, raising DownloadCancelled, once the token is cancelled."""
+        if cancel_token is None:
+            page.wait_for_timeout(milliseconds)
+            return
+        remaining = milliseconds
+        while remaining > 0:
+            cancel_token.check()
+            step = min(250, remaining)
+            page.wait_for_timeout(step)
+            remaining -= step
+        cancel_token.check()
+
+    @staticmethod
+    def _goto(page, url: str, wait_until: str, timeout: int, cancel_token=None):
+        """page.goto() that keeps checking the token while the page loads."""
+        if cancel_token is None:
+            page.goto(url, wait_until=wait_until, timeout=timeout)
+            return
+        cancel_token.check()
+        page.goto(url, wait_until="commit", timeout=timeout)
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            cancel_token.check()
+            try:
+                page.wait_for_load_state(wait_until, timeout=250)
+                return
+            except PlaywrightTimeoutError:
+                if time.monotonic() > deadline:
+                    raise
+
+    @staticmethod
+    def _wait_for_selector(page, selector: str, timeout: int, cancel_token=None):
+        """page.wait_for_selector(state="visible") that keeps checking the token."""
+        if cancel_token is None:
+            page.wait_for_selector(selector, state="visible", timeout=timeout)
+            return
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            cancel_token.check()
+            try:
+                page.wait_for_selector(selector, state="visible", timeout=250)
+                return
+            except PlaywrightTimeoutError:
+                if time.monotonic() > deadline:
+                    raise
+
+    def fetch_image_urls(self, chapter_url: str, cancel_token=None) -> tuple[list[str], str]:
         """
         Fetches all image URLs from a given Comick.io chapter URL.
 
         Args:
             chapter_url: The URL of the chapter to scrape.
+            cancel_token: Optional CancelToken checked between navigations and waits.
 
         Returns:
             A tuple containing a list of image URLs and the user agent used.
+
+        Raises:
+            DownloadCancelled: If the token is cancelled.
         """
+        check_cancelled(cancel_token)
         print("🚀 Getting Cloudflare cookies using cloudscraper...")
         try:
-            resp = self.scraper.get(chapter_url)
+            resp = self._get(chapter_url)
             resp.raise_for_status()
         except requests.exceptions.RequestException as e:
             print(f"❌ Failed to fetch with cloudscraper: {e}")
@@ -36,11 +182,29 @@ class ComickScraper:
         cookies = self.scraper.cookies.get_dict()
         user_agent = self.scraper.headers["User-Agent"]
 
+        check_cancelled(cancel_token)
+        if self.browser:
+            return self._extract_image_urls(self.browser, chapter_url, user_agent, cookies, cancel_token), user_agent
+
         print("🧭 Launching Playwright with Cloudflare cookies...")
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(user_agent=user_agent)
+            browser = self._launch(p, headless=True)
+            try:
+                image_urls = self._extract_image_urls(browser, chapter_url, user_agent, cookies, cancel_token)
+            finally:
+                browser.close()
 
+        return image_urls, user_agent
+
+    def _extract_image_urls(self, browser, chapter_url: str, user_agent: str, cookies: dict, cancel_token=None) -> list[str]:
+        """Loads a chapter page in a fresh browser context and collects its image URLs."""
+        try:
+            context = self._new_context(browser, chapter_url, user_agent=user_agent)
+        except ReplayMissError as e:
+            print(f"❌ {e}")
+            return []
+        block_stats = self._block_resources(context) if self.block_resources else None
+        try:
             cookie_list = [{"name": k, "value": v, "domain": "comick.io", "path": "/"} for k, v in cookies.items()]
             context.add_cookies(cookie_list)
 
@@ -50,34 +214,41 @@ class ComickScraper:
             max_retries = 3
             for attempt in range(max_retries):
                 try:
-                    page.goto(chapter_url, wait_until="load", timeout=30000) # Increased timeout to 30 seconds
-                    page.wait_for_timeout(5000)  # Wait for dynamic content
+                    self._goto(page, chapter_url, "load", 30000, cancel_token) # Increased timeout to 30 seconds
+                    self._wait(page, 5000, cancel_token)  # Wait for dynamic content
                     break # If successful, break the retry loop
+                except DownloadCancelled:
+                    raise
                 except Exception as e:
                     print(f"⚠️ Attempt {attempt + 1}/{max_retries} failed for {chapter_url}: {e}")
                     if attempt < max_retries - 1:
                         print("Retrying in 5 seconds...")
-                        page.wait_for_timeout(5000) # Wait before retrying
+                        self._wait(page, 5000, cancel_token) # Wait before retrying
                     else:
                         print(f"❌ All {max_retries} attempts failed for {chapter_url}.")
-                        browser.close()
-                        return [], "" # Return empty on final failure
+                        return [] # Return empty on final failure
 
             print("📸 Extracting image URLs...")
             img_elements = page.query_selector_all('img[src*="meo.comick.pictures"]')
             image_urls = [img.get_attribute("src") for img in img_elements if img.get_attribute("src")]
             
             print(f"🔍 Found {len(image_urls)} images")
-            browser.close()
-
-        return image_urls, user_agent
-
-    def fetch_chapter_list(self, manga_url: str) -> list[dict]:
+            return image_urls
+        finally:
+            context.close()
+            if block_stats is not None:
+                with self.block_stats_lock:
+                    self.block_stats[chapter_url] = block_stats
+
+    def fetch_chapter_list(self, manga_url: str, cancel_token=None, on_page=None) -> list[dict]:
         """
         Fetches the list of chapters from a manga's main page, handling pagination.
 
         Args:
             manga_url: The URL of the manga's main page.
+            cancel_token: Optional CancelToken checked between pages and waits.
+            on_page: Optional callback called with the new chapters of each
+                page as soon as it is parsed, in page order.
 
         Returns:
             A list of dictionaries, where each dictionary represents a chapter
@@ -88,8 +259,14 @@ class ComickScraper:
         page_num = 1
         
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=False)
-            page = browser.new_page()
+            browser = self._launch(p, headless=False)
+            try:
+                context = self._new_context(browser, manga_url)
+            except ReplayMissError as e:
+                print(f"❌ {e}")
+                browser.close()
+                return []
+            page = context.new_page()
             
             # Set a default timeout for all page operations
             page.set_default_timeout(30000) # 30 seconds
@@ -107,12 +284,15 @@ class ComickScraper:
                 
                 try:
                     print(f"Navigating to {current_url}...")
-                    page.goto(current_url, wait_until="domcontentloaded")
+                    self._goto(page, current_url, "domcontentloaded", 30000, cancel_token)
                     print("Page loaded. Waiting for chapter selector...")
                     # Wait for chapter links to be visible
-                    page.wait_for_selector('a[href*="/comic/"][href*="chapter"]', state="visible")
+                    self._wait_for_selector(page, 'a[href*="/comic/"][href*="chapter"]', 30000, cancel_token)
                     print("Chapter selector found.")
-                    page.wait_for_timeout(3000) # Extra wait for dynamic content
+                    self._wait(page, 3000, cancel_token) # Extra wait for dynamic content
+                except DownloadCancelled:
+                    browser.close()
+                    raise
                 except Exception as e:
                     print(f"Exception during navigation or selector wait: {e}")
                     # This can happen if the page doesn't exist or has no chapters, which is our exit condition
@@ -122,7 +302,7 @@ class ComickScraper:
                 try:
                     # Scroll to the bottom of the page to load all chapters
                     page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    page.wait_for_timeout(3000)  # Wait for dynamic content
+                    self._wait(page, 3000, cancel_token)  # Wait for dynamic content
 
                     content = page.content()
                     soup = BeautifulSoup(content, 'html.parser')
@@ -134,6 +314,7 @@ class ComickScraper:
                         break # Exit condition: no more chapters on the page
 
                     new_chapters_found_on_page = 0
+                    page_chapters = []
                     for row in chapter_rows:
                         link_element = row.select_one('a[href*="/comic/"][href*="chapter"]')
                         if not link_element:
@@ -160,6 +341,7 @@ class ComickScraper:
                             chapter_num = float(match.group(1))
                             if chapter_num not in chapters:
                                 chapters[chapter_num] = {"title": title, "url": url}
+                                page_chapters.append(chapters[chapter_num])
                                 new_chapters_found_on_page += 1
                     
                     if new_chapters_found_on_page == 0 and page_num > 1:
@@ -167,12 +349,18 @@ class ComickScraper:
                         break
 
                     print(f"Found {new_chapters_found_on_page} new chapters on page {page_num}.")
+                    if on_page:
+                        on_page(page_chapters)
                     page_num += 1
 
+                except DownloadCancelled:
+                    browser.close()
+                    raise
                 except Exception as e:
                     print(f"❌ An error occurred while processing page {page_num}: {e}")
                     break # Exit loop on error
             
+            context.close() # Writes the recorded HAR, if recording
             browser.close()
 
         # Sort chapters by chapter number
@@ -181,12 +369,45 @@ class ComickScraper:
         print(f"🔍 Found a total of {len(sorted_chapters)} unique chapters.")
         return sorted_chapters
 
-    def search_manga(self, query: str) -> list[dict]:
+    def fetch_chapter_list_cached(self, manga_url: str, cache_dir: str, cancel_token=None, on_page=None) -> list[dict]:
+        """
+        Like fetch_chapter_list(), but keeps the list in cache_dir together with
+        the manga page's ETag/Last-Modified validators. If a conditional request
+        for the manga page comes back 304 Not Modified, the cached list is
+        returned without opening a browser.
+        """
+        metadata = MetadataFile(os.path.join(cache_dir, SERIES_METADATA_FILENAME))
+        cached = metadata.get("chapters") if metadata.get("manga_url") == manga_url else None
+        validators = metadata.get("validators", {}) if cached else {}
+
+        check_cancelled(cancel_token)
+        try:
+            resp = self._get(manga_url, headers=conditional_headers(validators))
+            if cached and resp.status_code == 304:
+                print(f"📚 Chapter list unchanged since the last run, using {len(cached)} cached chapters.")
+                if on_page:
+                    on_page(cached)
+                return cached
+            resp.raise_for_status()
+            validators = validators_from(resp.headers)
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Could not revalidate the cached chapter list: {e}")
+            validators = {}
+
+        chapters = self.fetch_chapter_list(manga_url, cancel_token=cancel_token, on_page=on_page)
+        if chapters:
+            os.makedirs(cache_dir, exist_ok=True)
+            metadata.update(manga_url=manga_url, chapters=chapters, validators=validators)
+            metadata.save()
+        return chapters
+
+    def search_manga(self, query: str, cancel_token=None) -> list[dict]:
         """
         Searches for manga on Comick.io.
 
         Args:
             query: The search term.
+            cancel_token: Optional CancelToken checked while scrolling through results.
 
         Returns:
             A list of dictionaries, where each dictionary represents a manga
@@ -197,7 +418,7 @@ class ComickScraper:
 
         print("🚀 Getting Cloudflare cookies using cloudscraper...")
         try:
-            resp = self.scraper.get(search_url)
+            resp = self._get(search_url)
             resp.raise_for_status()
         except requests.exceptions.RequestException as e:
             print(f"❌ Failed to fetch with cloudscraper: {e}")
@@ -208,20 +429,31 @@ class ComickScraper:
 
         print("🧭 Launching Playwright with Cloudflare cookies...")
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=False)
-            context = browser.new_context(user_agent=user_agent)
+            browser = self._launch(p, headless=False)
+            try:
+                context = self._new_context(browser, search_url, user_agent=user_agent)
+            except ReplayMissError as e:
+                print(f"❌ {e}")
+                browser.close()
+                return []
 
             cookie_list = [{"name": k, "value": v, "domain": "comick.io", "path": "/"} for k, v in cookies.items()]
             context.add_cookies(cookie_list)
 
             page = context.new_page()
             print(f"🌐 Visiting: {search_url}")
-            page.goto(search_url, wait_until="networkidle")
+            try:
+                self._goto(page, search_url, "networkidle", 30000, cancel_token)
+            except DownloadCancelled:
+                browser.close()
+                raise
             
             results = []
             last_height = page.evaluate("document.body.scrollHeight")
             
             while True:
+                if cancel_token is not None and cancel_token.cancelled:
+                    break # Keep what was found so far
                 # Scroll down
                 page.evaluate("window.scrollBy(0, 500)") # Scroll by 500px
                 page.wait_for_timeout(1000)
@@ -247,6 +479,7 @@ class ComickScraper:
                 if page.evaluate("window.pageYOffset + window.innerHeight") >= new_height:
                     break
             
+            context.close() # Writes the recorded HAR, if recording
             browser.close()
         
         print(f"🔍 Found {len(results)} results.")
@@ -0,0 +1,100 @@
+# core/tasks.py
+import os
+from .cancel import check_cancelled
+from utils.sanitizer import sanitize_filename
+
+class IncompleteChapterError(Exception):
+    """Raised when some of a chapter's pages could not be downloaded, even after requeueing them."""
+
+def chapter_paths(chapter: dict, base_output_dir: str) -> tuple[str, str]:
+    """Returns the image directory and PDF path for a chapter."""
+    sanitized_title = sanitize_filename(chapter['title'])
+    return os.path.join(base_output_dir, sanitized_title), os.path.join(base_output_dir, f"{sanitized_title}.pdf")
+
+def scrape_chapter(scraper, chapter: dict, cancel_token=None) -> tuple[list[str], str, dict | None]:
+    """
+    Resolves a chapter's image URLs.
+
+    Returns:
+        The image URLs, the user agent to download them with, and the
+        statistics of requests the browser blocked (None if not recorded).
+    """
+    image_urls, user_agent = scraper.fetch_image_urls(chapter['url'], cancel_token=cancel_token)
+    pop_block_stats = getattr(scraper, "pop_block_stats", None)
+    return image_urls, user_agent, pop_block_stats(chapter['url']) if pop_block_stats else None
+
+def report_blocked_resources(chapter: dict, image_urls: list[str], saved_files: list[str], block_stats: dict | None, log=print):
+    """
+    Logs how much the scraper saved by not loading resources. Blocked page
+    images are the same files Downloader fetches, so their size is known
+    from the download; other blocked requests are only counted.
+    """
+    if not block_stats or not block_stats["requests"]:
+        return
+    blocked_urls = set(block_stats["urls"])
+    files_by_index = {os.path.basename(path).split(".")[0]: path for path in saved_files}
+    saved_bytes = sum(
+        os.path.getsize(files_by_index[f"{idx:03d}"])
+        for idx, url in enumerate(image_urls, start=1)
+        if url in blocked_urls and f"{idx:03d}" in files_by_index
+    )
+    by_type = ", ".join(f"{kind}: {count}" for kind, count in sorted(block_stats["by_type"].items()))
+    log(f"🛡️ Scraping {chapter['title']} skipped {block_stats['requests']} requests ({by_type}), saving at least {saved_bytes / 1024:.0f} KB")
+
+def download_chapter_images(downloader, chapter: dict, base_output_dir: str, image_urls: list[str], user_agent: str, block_stats: dict | None = None, log=print, cancel_token=None) -> int:
+    """
+    Downloads a chapter's images and returns the number of bytes written.
+
+    Raises:
+        IncompleteChapterError: If some pages are still missing, so the
+            chapter is not packaged (and its images not deleted) half done.
+    """
+    chapter_output_dir, _ = chapter_paths(chapter, base_output_dir)
+    saved_files = downloader.download_images(image_urls, chapter_output_dir, user_agent, chapter['url'], cancel_token=cancel_token)
+    report_blocked_resources(chapter, image_urls, saved_files, block_stats, log)
+    if len(saved_files) < len(image_urls):
+        raise IncompleteChapterError(f"{len(image_urls) - len(saved_files)} of {len(image_urls)} pages could not be downloaded")
+    return sum(os.path.getsize(path) for path in saved_files)
+
+def package_chapter(downloader, chapter: dict, base_output_dir: str, delete_images_after_pdf: bool, log=print, cancel_token=None):
+    """Converts a downloaded chapter to PDF and optionally removes its images."""
+    check_cancelled(cancel_token)
+    chapter_output_dir, pdf_output_path = chapter_paths(chapter, base_output_dir)
+    downloader.convert_to_pdf(chapter_output_dir, pdf_output_path)
+    if delete_images_after_pdf:
+        downloader.delete_images(chapter_output_dir, pdf_output_path)
+        try:
+            os.rmdir(chapter_output_dir) # Attempt to remove empty directory
+            log(f"🗑️ Removed empty chapter directory: {chapter_output_dir}")
+        except OSError:
+            pass # Directory might not be empty if non-image files exist
+
+def download_chapter(scraper, downloader, chapter: dict, base_output_dir: str, convert_to_pdf: bool, delete_images_after_pdf: bool, log=print, cancel_token=None) -> int | None:
+    """
+    Scrapes, downloads and optionally converts a single chapter.
+
+    Args:
+        scraper: The ComickScraper (or ScraperPool) used to resolve image URLs.
+        downloader: The Downloader used to fetch and convert images.
+        chapter: A chapter dictionary with 'title' and 'url'.
+        base_output_dir: The series directory the chapter is saved under.
+        convert_to_pdf: Whether to convert the chapter to PDF.
+        delete_images_after_pdf: Whether to delete the images after conversion.
+        log: Function used for progress messages.
+        cancel_token: Optional CancelToken to stop or pause the chapter.
+
+    Returns:
+        The number of bytes downloaded, or None if no images were found.
+
+    Raises:
+        IncompleteChapterError: If some pages could not be downloaded.
+        DownloadCancelled: If the token is cancelled.
+    """
+    image_urls, user_agent, block_stats = scrape_chapter(scraper, chapter, cancel_token)
+    if not image_urls:
+        return None
+
+    downloaded_bytes = download_chapter_images(downloader, chapter, base_output_dir, image_urls, user_agent, block_stats, log, cancel_token)
+    if convert_to_pdf:
+        package_chapter(downloader, chapter, base_output_dir, delete_images_after_pdf, log, cancel_token)
+    return downloaded_bytes
@@ -0,0 +1,81 @@
+# core/transport.py
+from contextlib import contextmanager
+
+class StreamedResponse:
+    """The parts of a streamed response the Downloader uses, whatever HTTP client produced it."""
+    def __init__(self, status_code: int, headers, iter_chunks):
+        self.status_code = status_code
+        self.headers = headers # Case-insensitive mapping
+        self._iter_chunks = iter_chunks
+
+    def iter_content(self, chunk_size: int):
+        return self._iter_chunks(chunk_size)
+
+class RequestsTransport:
+    """
+    HTTP/1.1 transport on a requests Session. Connections are kept alive
+    and reused, but each concurrent download still needs its own connection.
+    """
+    name = "requests"
+
+    def __init__(self, pool_size: int = 10):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.errors = (requests.exceptions.RequestException,)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @contextmanager
+    def stream(self, url: str, headers: dict, timeout: float):
+        """Sends a GET and yields a StreamedResponse; raises one of self.errors for HTTP errors other than 304."""
+        with self.session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+            if response.status_code != 304: # Not Modified answers a conditional request
+                response.raise_for_status()
+            yield StreamedResponse(response.status_code, response.headers, lambda chunk_size: response.iter_content(chunk_size=chunk_size))
+
+    def close(self):
+        self.session.close()
+
+class HttpxTransport:
+    """
+    HTTP/2 transport on an httpx Client. Concurrent downloads from the same
+    host are multiplexed as streams over a single connection. Needs the
+    optional `httpx[http2]` dependency.
+
+    http1=False makes the client speak HTTP/2 without negotiation (h2c prior
+    knowledge), which is what plain-http test servers need.
+    """
+    name = "httpx-h2"
+
+    def __init__(self, pool_size: int = 10, http1: bool = True):
+        try:
+            import httpx
+            import h2 # noqa: F401  (httpx only enables HTTP/2 if h2 is installed)
+        except ImportError as e:
+            raise RuntimeError("The HTTP/2 transport needs httpx with HTTP/2 support: pip install 'httpx[http2]'") from e
+
+        self.errors = (httpx.HTTPError, httpx.StreamError)
+        self.client = httpx.Client(
+            http1=http1,
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    @contextmanager
+    def stream(self, url: str, headers: dict, timeout: float):
+        """Sends a GET and yields a StreamedResponse; raises one of self.errors for HTTP errors other than 304."""
+        with self.client.stream("GET", url, headers=headers, timeout=timeout) as response:
+            if response.status_code != 304: # Not Modified answers a conditional request
+                response.raise_for_status()
+            yield StreamedResponse(response.status_code, response.headers, response.iter_bytes)
+
+    def close(self):
+        self.client.close()
+
+def make_transport(http2: bool = False, pool_size: int = 10):
+    """Returns the HTTP/2 transport if asked for, otherwise the requests one."""
+    return HttpxTransport(pool_size) if http2 else RequestsTransport(pool_size)
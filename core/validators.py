@@ -0,0 +1,65 @@
+# core/validators.py
+import json
+import os
+import threading
+
+class MetadataFile:
+    """
+    A small JSON file kept next to downloaded files (e.g. a chapter's image
+    URLs and the ETag/Last-Modified validators of each page), so later runs
+    can revalidate them with conditional requests instead of fetching them
+    again. Writes are atomic and the object is safe to share between threads.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable metadata file {path}: {e}")
+
+    def get(self, key: str, default=None):
+        with self.lock:
+            return self.data.get(key, default)
+
+    def update(self, **values):
+        with self.lock:
+            self.data.update(values)
+
+    def get_page(self, filename: str) -> dict:
+        with self.lock:
+            return dict(self.data.get("pages", {}).get(filename, {}))
+
+    def set_page(self, filename: str, url: str, headers, size: int):
+        """Records the validators a page was served with."""
+        with self.lock:
+            self.data.setdefault("pages", {})[filename] = {"url": url, "size": size, **validators_from(headers)}
+
+    def save(self):
+        with self.lock:
+            temp_path = f"{self.path}.part"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(temp_path, self.path)
+
+def validators_from(headers) -> dict:
+    """Picks the ETag and Last-Modified validators out of response headers."""
+    validators = {}
+    if headers.get("ETag"):
+        validators["etag"] = headers["ETag"]
+    if headers.get("Last-Modified"):
+        validators["last_modified"] = headers["Last-Modified"]
+    return validators
+
+def conditional_headers(validators: dict) -> dict:
+    """Request headers that turn a GET into a conditional one, answered with 304 if nothing changed."""
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
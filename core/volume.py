@@ -0,0 +1,157 @@
+# core/volume.py
+import os
+import re
+import zipfile
+
+VOLUME_FORMATS = (".pdf", ".cbz")
+
+def natural_sort_key(path: str):
+    """Sorts 'Chapter 2' before 'Chapter 10'."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", os.path.basename(path))]
+
+def chapter_title(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+def collect_chapter_files(inputs: list[str], extension: str, exclude: str | None = None) -> list[str]:
+    """
+    Expands the given files and directories into a list of chapter files.
+    Files are kept in the order given; the files of a directory are sorted
+    naturally by name.
+    """
+    paths = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            found = [os.path.join(entry, name) for name in os.listdir(entry) if name.lower().endswith(extension)]
+            paths.extend(sorted(found, key=natural_sort_key))
+        else:
+            paths.append(entry)
+    if exclude:
+        paths = [path for path in paths if os.path.abspath(path) != os.path.abspath(exclude)]
+    return paths
+
+def build_pdf_volume(chapter_paths: list[str], output_path: str, append: bool = False) -> list[str]:
+    """
+    Concatenates chapter PDFs into one volume PDF with a bookmark per chapter.
+    Page objects and their (already compressed) image streams are copied as
+    they are, so no image is decoded or re-encoded.
+
+    Args:
+        chapter_paths: The chapter PDFs, in reading order.
+        output_path: The volume PDF to write.
+        append: Add to an existing volume instead of replacing it, skipping
+            chapters whose bookmark it already has.
+
+    Returns:
+        The titles of the chapters that were added.
+    """
+    try:
+        from pypdf import PdfWriter
+        from pypdf.errors import PyPdfError
+    except ImportError as e:
+        raise RuntimeError("Building PDF volumes needs pypdf: pip install pypdf") from e
+
+    if append and os.path.exists(output_path):
+        try:
+            writer = PdfWriter(clone_from=output_path)
+        except (OSError, PyPdfError) as e:
+            raise RuntimeError(f"Could not read the existing volume {output_path}: {e}") from e
+        existing = {item.title for item in writer.outline if not isinstance(item, list)}
+    else:
+        writer = PdfWriter()
+        existing = set()
+
+    added = []
+    for path in chapter_paths:
+        title = chapter_title(path)
+        if title in existing:
+            print(f"⏭️ {title} is already in the volume, skipping.")
+            continue
+        try:
+            writer.append(path, outline_item=title, import_outline=False)
+        except (OSError, PyPdfError) as e:
+            # Nothing has been written yet, so the volume is left as it was
+            raise RuntimeError(f"Could not read chapter {path}: {e}") from e
+        added.append(title)
+        print(f"📎 Added {title}")
+
+    if added:
+        temp_path = f"{output_path}.part"
+        with open(temp_path, "wb") as f:
+            writer.write(f)
+        os.replace(temp_path, output_path)
+    writer.close()
+    return added
+
+def build_cbz_volume(chapter_paths: list[str], output_path: str, append: bool = False) -> list[str]:
+    """
+    Concatenates chapter CBZs into one volume CBZ. Each chapter's pages go
+    into their own numbered folder, which comic readers show as chapters.
+    Pages are copied byte for byte. With append, the new chapters are added
+    to the end of an existing volume without rewriting it.
+
+    Returns:
+        The titles of the chapters that were added.
+    """
+    appending = append and os.path.exists(output_path)
+    temp_path = output_path if appending else f"{output_path}.part"
+    added = []
+    if appending and not zipfile.is_zipfile(output_path):
+        # ZipFile's "a" mode would silently tack a new archive onto any other file
+        raise RuntimeError(f"{output_path} is not a CBZ file")
+    try:
+        volume = zipfile.ZipFile(temp_path, "a" if appending else "w", zipfile.ZIP_STORED)
+    except (OSError, zipfile.BadZipFile) as e:
+        raise RuntimeError(f"Could not open the volume {output_path}: {e}") from e
+    try:
+        with volume:
+            folders = {name.split("/", 1)[0] for name in volume.namelist() if "/" in name}
+            existing = {folder.split(" - ", 1)[-1] for folder in folders}
+            for path in chapter_paths:
+                title = chapter_title(path)
+                if title in existing:
+                    print(f"⏭️ {title} is already in the volume, skipping.")
+                    continue
+                # Every page is read (and CRC-checked) before any is written, so a bad chapter
+                # cannot leave a half-written folder that later runs would take as present
+                try:
+                    with zipfile.ZipFile(path) as chapter:
+                        infos = sorted((info for info in chapter.infolist() if not info.is_dir()), key=lambda info: natural_sort_key(info.filename))
+                        pages = [(os.path.basename(info.filename), chapter.read(info)) for info in infos]
+                except (OSError, zipfile.BadZipFile) as e:
+                    raise RuntimeError(f"Could not read chapter {path}: {e}") from e
+                folder = f"{len(folders) + 1:03d} - {title}"
+                folders.add(folder)
+                for name, data in pages:
+                    # Images are already compressed, so they are stored rather than deflated again
+                    volume.writestr(f"{folder}/{name}", data, compress_type=zipfile.ZIP_STORED)
+                added.append(title)
+                print(f"📎 Added {title}")
+    except BaseException:
+        if not appending and os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if not appending:
+        os.replace(temp_path, output_path)
+    return added
+
+def build_volume(inputs: list[str], output_path: str, append: bool = False) -> list[str]:
+    """Builds a PDF or CBZ volume, depending on the output file's extension, from chapter files or directories."""
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension not in VOLUME_FORMATS:
+        raise ValueError(f"Volumes can be .pdf or .cbz files, not '{extension or output_path}'")
+
+    missing = [entry for entry in inputs if not os.path.exists(entry)]
+    if missing:
+        raise ValueError(f"No such file or directory: {', '.join(missing)}")
+
+    chapter_paths = collect_chapter_files(inputs, extension, exclude=output_path)
+    mismatched = [path for path in chapter_paths if not path.lower().endswith(extension)]
+    if mismatched:
+        raise ValueError(f"A {extension} volume can only be built from {extension} chapters: {', '.join(mismatched)}")
+    if not chapter_paths:
+        raise ValueError(f"No {extension} chapters found in {', '.join(inputs)}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    if extension == ".pdf":
+        return build_pdf_volume(chapter_paths, output_path, append)
+    return build_cbz_volume(chapter_paths, output_path, append)
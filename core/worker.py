@@ -0,0 +1,81 @@
+# core/worker.py
+import os
+import socket
+import threading
+import traceback
+from .jobs import ChapterQueue
+from .tasks import download_chapter
+
+class ChapterWorker:
+    """
+    Claims chapters from a shared ChapterQueue and downloads them, renewing
+    the leases of in-flight chapters from a heartbeat thread. Several
+    workers can run against the same queue file, on one or many hosts.
+    """
+    def __init__(self, queue: ChapterQueue, scraper, downloader, threads: int = 2, lease_seconds: float = 120, wait: bool = False, poll_interval: float = 5):
+        self.queue = queue
+        self.scraper = scraper
+        self.downloader = downloader
+        self.threads = threads
+        self.lease_seconds = lease_seconds
+        self.wait = wait
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.active = {} # job id -> owner id of chapters currently being processed
+        self.active_lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    def run(self):
+        """Processes chapters until the queue is drained (or forever with wait=True)."""
+        print(f"👷 Worker {self.worker_id} started with {self.threads} thread(s).")
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+
+        threads = [threading.Thread(target=self._work_loop, args=(f"{self.worker_id}-{i}",)) for i in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        finally:
+            self.stopping.set()
+            heartbeat.join()
+        print(f"🏁 Worker {self.worker_id} finished. Queue status: {self.queue.counts()}")
+
+    def _work_loop(self, owner: str):
+        while not self.stopping.is_set():
+            job = self.queue.claim(owner, self.lease_seconds)
+            if job is None:
+                counts = self.queue.counts()
+                # Chapters leased by other workers may still come back if those workers die
+                if not self.wait and not counts.get('pending') and not counts.get('leased'):
+                    return
+                self.stopping.wait(self.poll_interval)
+                continue
+
+            with self.active_lock:
+                self.active[job['id']] = owner
+            print(f"📖 [{owner}] Downloading {job['title']} (attempt {job['attempts'] + 1})")
+            try:
+                chapter = {"title": job['title'], "url": job['url']}
+                downloaded_bytes = download_chapter(self.scraper, self.downloader, chapter, job['output_dir'], bool(job['pdf']), bool(job['delete_images']))
+                if downloaded_bytes is None:
+                    self.queue.fail(job['id'], owner, "no images found")
+                else:
+                    self.queue.complete(job['id'], owner, downloaded_bytes)
+            except Exception as e:
+                print(f"❌ [{owner}] {job['title']} failed: {e}")
+                traceback.print_exc()
+                self.queue.fail(job['id'], owner, str(e))
+            finally:
+                with self.active_lock:
+                    self.active.pop(job['id'], None)
+
+    def _heartbeat_loop(self):
+        interval = self.lease_seconds / 3
+        while not self.stopping.wait(interval):
+            with self.active_lock:
+                active = list(self.active.items())
+            for job_id, owner in active:
+                if not self.queue.heartbeat(job_id, owner, self.lease_seconds):
+                    print(f"⚠️ Lost the lease on chapter job {job_id}; another worker may redo it.")
@@ -1,8 +1,13 @@
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, QThread
 from core.scraper import ComickScraper
 from core.downloader import Downloader
-import os
-from utils.sanitizer import sanitize_filename
+from core.scrape_pool import ScraperPool
+from core.config import SCRAPE_WORKERS, PREFETCH_BUDGET
+from core.prefetch import ImageUrlPrefetcher
+from core.tasks import download_chapter
+from core.cancel import CancelToken, DownloadCancelled
+from core.progress import TransferProgress
+from gui.models import TitleListModel
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
@@ -25,17 +30,33 @@ class GuiController(QObject):
     # Signals to update the GUI
     searchResultsReady = pyqtSignal(list)
     chaptersReady = pyqtSignal(list)
+    chaptersPageReady = pyqtSignal(list) # Emitted from the fetching thread for each page of chapters
     downloadProgress = pyqtSignal(int)
+    transferProgress = pyqtSignal(dict) # TransferProgress snapshots, a few per second at most
     downloadFinished = pyqtSignal(str) # PDF path
+    downloadCancelled = pyqtSignal()
 
     def __init__(self):
         super().__init__()
         self.scraper = ComickScraper()
         self.downloader = Downloader()
-        self.manga_list = []
-        self.chapter_list = []
+        self.scrape_pool = None # Started on the first download, see _image_source()
+        self.prefetcher = None # Resolves image lists while chapters are being picked, see _prefetcher()
+        # Models the GUI's list views show; their rows are the search results and chapters
+        self.result_model = TitleListModel(self)
+        self.chapter_model = TitleListModel(self)
+        self.chaptersPageReady.connect(self.on_chapters_page)
         self.thread = None
         self.worker = None
+        self.cancel_token = None # CancelToken of the running download, if any
+
+    @property
+    def manga_list(self):
+        return self.result_model.items
+
+    @property
+    def chapter_list(self):
+        return self.chapter_model.items
 
     def _run_in_thread(self, fn, on_finish, *args, **kwargs):
         self.thread = QThread()
@@ -55,7 +76,7 @@ class GuiController(QObject):
         self._run_in_thread(self.scraper.search_manga, self.on_search_finished, query)
 
     def on_search_finished(self, results):
-        self.manga_list = results
+        self.result_model.set_items(results)
         self.searchResultsReady.emit(results)
 
     @pyqtSlot(int)
@@ -64,17 +85,32 @@ class GuiController(QObject):
         if 0 <= manga_index < len(self.manga_list):
             manga = self.manga_list[manga_index]
             print(f"Controller: Fetching chapters for {manga['title']}")
-            self._run_in_thread(self.scraper.fetch_chapter_list, self.on_chapters_finished, manga['url'])
+            self.chapter_model.set_items([])
+            self._run_in_thread(self.scraper.fetch_chapter_list, self.on_chapters_finished, manga['url'], on_page=self.chaptersPageReady.emit)
+
+    @pyqtSlot(list)
+    def on_chapters_page(self, chapters):
+        self.chapter_model.append_items(chapters)
 
     def on_chapters_finished(self, chapters):
-        self.chapter_list = chapters
+        # The pages arrive in site order; switch to the sorted list without losing the user's selection
+        self.chapter_model.reorder_items(chapters)
         self.chaptersReady.emit(chapters)
+        # Until the user selects something, the newest chapters are the likeliest downloads
+        if chapters:
+            self._prefetcher().prefetch(chapters[::-1][:PREFETCH_BUDGET])
+
+    @pyqtSlot(list)
+    def prefetch_chapters(self, indices):
+        """Prefetches image lists for the given chapters (most likely first), replacing earlier requests."""
+        self._prefetcher().prefetch([self.chapter_list[i] for i in indices if 0 <= i < len(self.chapter_list)])
 
     @pyqtSlot(str)
     def fetch_chapters_from_url(self, url):
         """Fetches chapters directly from a manga URL."""
         print(f"Controller: Fetching chapters from URL {url}")
-        self._run_in_thread(self.scraper.fetch_chapter_list, self.on_chapters_finished, url)
+        self.chapter_model.set_items([])
+        self._run_in_thread(self.scraper.fetch_chapter_list, self.on_chapters_finished, url, on_page=self.chaptersPageReady.emit)
 
     @pyqtSlot(list, str, bool, bool)
     def start_download(self, selected_indices, output_dir, convert_to_pdf, delete_images):
@@ -84,31 +120,67 @@ class GuiController(QObject):
             return
 
         print(f"Controller: Download requested for {len(chapters_to_download)} chapters.")
-        self._run_in_thread(self._perform_download, self.on_download_finished, chapters_to_download, output_dir, convert_to_pdf, delete_images)
+        # Keep what was prefetched, but let the download have the browsers from now on
+        self._prefetcher().hold([chapter['url'] for chapter in chapters_to_download])
+        self.cancel_token = CancelToken()
+        self._run_in_thread(self._perform_download, self.on_download_finished, chapters_to_download, output_dir, convert_to_pdf, delete_images, self.cancel_token)
+
+    @pyqtSlot()
+    def stop_download(self):
+        """Cancels the running download. Threads, browsers and connections wind down at their next check."""
+        if self.cancel_token:
+            print("Controller: Stopping download.")
+            self.cancel_token.cancel()
 
-    def _perform_download(self, chapters, output_dir, convert_to_pdf, delete_images):
+    @pyqtSlot()
+    def pause_download(self):
+        if self.cancel_token:
+            print("Controller: Pausing download.")
+            self.cancel_token.pause()
+
+    @pyqtSlot()
+    def resume_download(self):
+        if self.cancel_token:
+            print("Controller: Resuming download.")
+            self.cancel_token.resume()
+
+    def _image_source(self):
+        """Returns the browser process pool used to find chapter images, starting it if needed."""
+        if SCRAPE_WORKERS <= 0:
+            return self.scraper
+        if self.scrape_pool is None:
+            self.scrape_pool = ScraperPool(SCRAPE_WORKERS)
+        return self.scrape_pool
+
+    def _prefetcher(self):
+        if self.prefetcher is None:
+            self.prefetcher = ImageUrlPrefetcher(self._image_source())
+        return self.prefetcher
+
+    def shutdown(self):
+        """Stops any running download and the browser processes. Called when the window closes."""
+        self.stop_download()
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
+        if self.scrape_pool is not None:
+            self.scrape_pool.close()
+            self.scrape_pool = None
+
+    def _perform_download(self, chapters, output_dir, convert_to_pdf, delete_images, cancel_token):
         total_chapters = len(chapters)
         completed_chapters = 0
         progress_lock = threading.Lock()
+        image_source = self._prefetcher() # Falls through to _image_source() for chapters it has not prefetched
 
         def _download_chapter_worker(chapter):
             nonlocal completed_chapters
             try:
                 print(f"Downloading chapter: {chapter['title']}")
                 
-                chapter_folder_name = sanitize_filename(chapter['title'])
-                chapter_output_dir = os.path.join(output_dir, chapter_folder_name)
-
-                image_urls, user_agent = self.scraper.fetch_image_urls(chapter['url'])
-                if image_urls:
-                    self.downloader.download_images(image_urls, chapter_output_dir, user_agent, chapter['url'])
-                    
-                    if convert_to_pdf:
-                        pdf_path = os.path.join(output_dir, f"{chapter_folder_name}.pdf")
-                        self.downloader.convert_to_pdf(chapter_output_dir, pdf_path)
-                        if delete_images:
-                            self.downloader.delete_images(chapter_output_dir)
-                            os.rmdir(chapter_output_dir)
+                download_chapter(image_source, self.downloader, chapter, output_dir, convert_to_pdf, delete_images, cancel_token=cancel_token)
+            except DownloadCancelled:
+                pass
             except Exception as e:
                 print(f"Error downloading chapter {chapter.get('title', 'N/A')}: {e}")
             finally:
@@ -117,14 +189,23 @@ class GuiController(QObject):
                     progress = int((completed_chapters / total_chapters) * 100)
                     self.downloadProgress.emit(progress)
 
-        with ThreadPoolExecutor(max_workers=5) as executor: # 5 chapters at a time
+        self.downloader.progress = TransferProgress(self.transferProgress.emit, chapters_total=total_chapters)
+        with self.downloader.progress, ThreadPoolExecutor(max_workers=5) as executor: # 5 chapters at a time
             futures = [executor.submit(_download_chapter_worker, chapter) for chapter in chapters]
             for future in as_completed(futures):
                 future.result() # Wait for all to complete and raise exceptions if any
+        self.downloader.progress = None
 
+        if cancel_token.cancelled:
+            return None
         return output_dir
 
     def on_download_finished(self, output_dir):
+        self.cancel_token = None
+        if output_dir is None:
+            print("Controller: Download stopped.")
+            self.downloadCancelled.emit()
+            return
         print("Controller: Download finished.")
         self.downloadFinished.emit(output_dir)
 
@@ -132,14 +213,14 @@ class GuiController(QObject):
     def download_single_chapter_from_url(self, url, output_dir, convert_to_pdf, delete_images):
         """Downloads a single chapter directly from a URL."""
         print(f"Controller: Downloading single chapter from {url}")
-        self._run_in_thread(self._perform_single_download, self.on_download_finished, url, output_dir, convert_to_pdf, delete_images)
+        self.cancel_token = CancelToken()
+        self._run_in_thread(self._perform_single_download, self.on_download_finished, url, output_dir, convert_to_pdf, delete_images, self.cancel_token)
 
-    def _perform_single_download(self, url, output_dir, convert_to_pdf, delete_images):
+    def _perform_single_download(self, url, output_dir, convert_to_pdf, delete_images, cancel_token):
         """Helper method to download a single chapter."""
         # Create a mock chapter object for the downloader
         # A bit of a hack, but it lets us reuse the existing download logic
         chapter_title = url.split("/")[-1] # Simple title extraction
         chapter = {"title": chapter_title, "url": url}
         
-        self._perform_download([chapter], output_dir, convert_to_pdf, delete_images)
-        return output_dir
+        return self._perform_download([chapter], output_dir, convert_to_pdf, delete_images, cancel_token)
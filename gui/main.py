@@ -3,12 +3,14 @@ import os
 import re
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QLineEdit, QPushButton, QListWidget, QLabel, QProgressBar,
-                             QListWidgetItem, QFileDialog, QMessageBox, QStatusBar, 
+                             QLineEdit, QPushButton, QListView, QLabel, QProgressBar,
+                             QFileDialog, QMessageBox, QStatusBar, QAbstractItemView,
                              QGraphicsOpacityEffect, QCheckBox)
-from PyQt6.QtCore import Qt, pyqtSlot, QPropertyAnimation, QEasingCurve
+from PyQt6.QtCore import (Qt, pyqtSlot, QPropertyAnimation, QEasingCurve, QSortFilterProxyModel,
+                          QItemSelection, QItemSelectionModel, QTimer)
 from gui.controllers import GuiController
 from core.config import DEFAULT_OUTPUT_DIR
+from core.progress import format_transfer
 
 class MangaDownloaderGUI(QWidget):
     def __init__(self):
@@ -35,18 +37,28 @@ class MangaDownloaderGUI(QWidget):
         main_layout.addLayout(search_layout)
 
         # Results and Chapters layout
-        self.results_list = QListWidget()
-        self.results_list.setAlternatingRowColors(True)
+        self.results_list = self.create_list_view(self.controller.result_model)
         main_layout.addWidget(QLabel("Search Results:"))
         main_layout.addWidget(self.results_list)
 
-        self.chapters_list = QListWidget()
-        self.chapters_list.setAlternatingRowColors(True)
-        self.chapters_list.setSelectionMode(QListWidget.SelectionMode.MultiSelection)
+        # The chapter view shows the controller's model through a filter, so typing
+        # in the filter box never rebuilds rows
+        self.chapter_filter = QSortFilterProxyModel(self)
+        self.chapter_filter.setSourceModel(self.controller.chapter_model)
+        self.chapter_filter.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.chapters_list = self.create_list_view(self.chapter_filter)
+        self.chapters_list.setSelectionMode(QAbstractItemView.SelectionMode.MultiSelection)
+        # Prefetch image lists for the selection once the user pauses, not on every click
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(400)
         
         chapter_selection_layout = QHBoxLayout()
+        self.chapter_filter_input = QLineEdit()
+        self.chapter_filter_input.setPlaceholderText("Filter chapters...")
         self.select_all_button = QPushButton("Select All")
         self.deselect_all_button = QPushButton("Deselect All")
+        chapter_selection_layout.addWidget(self.chapter_filter_input)
         chapter_selection_layout.addWidget(self.select_all_button)
         chapter_selection_layout.addWidget(self.deselect_all_button)
 
@@ -75,8 +87,14 @@ class MangaDownloaderGUI(QWidget):
         # Download layout
         download_layout = QHBoxLayout()
         self.download_button = QPushButton("Download Selected Chapters")
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.setEnabled(False)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setEnabled(False)
         self.progress_bar = QProgressBar()
         download_layout.addWidget(self.download_button)
+        download_layout.addWidget(self.pause_button)
+        download_layout.addWidget(self.stop_button)
         download_layout.addWidget(self.progress_bar)
         main_layout.addLayout(download_layout)
 
@@ -87,46 +105,65 @@ class MangaDownloaderGUI(QWidget):
 
         self.output_dir = os.path.abspath(DEFAULT_OUTPUT_DIR)
 
+    def create_list_view(self, model):
+        view = QListView()
+        view.setModel(model)
+        view.setAlternatingRowColors(True)
+        view.setUniformItemSizes(True) # Lets the view skip measuring every row
+        view.setLayoutMode(QListView.LayoutMode.Batched)
+        return view
+
     def connect_signals(self):
         self.search_button.clicked.connect(self.on_search_clicked)
-        self.results_list.itemClicked.connect(self.on_manga_selected)
+        self.results_list.clicked.connect(self.on_manga_selected)
         self.select_dir_button.clicked.connect(self.on_select_dir_clicked)
         self.download_button.clicked.connect(self.on_download_clicked)
         self.select_all_button.clicked.connect(self.select_all_chapters)
         self.deselect_all_button.clicked.connect(self.deselect_all_chapters)
+        self.chapter_filter_input.textChanged.connect(self.chapter_filter.setFilterFixedString)
+        self.chapters_list.selectionModel().selectionChanged.connect(lambda *_: self.prefetch_timer.start())
+        self.prefetch_timer.timeout.connect(self.prefetch_selected_chapters)
+        self.pause_button.clicked.connect(self.on_pause_clicked)
+        self.stop_button.clicked.connect(self.on_stop_clicked)
 
         self.controller.searchResultsReady.connect(self.update_search_results)
         self.controller.chaptersReady.connect(self.update_chapter_list)
+        self.controller.chaptersPageReady.connect(self.on_chapters_page)
         self.controller.downloadProgress.connect(self.update_progress_bar)
+        self.controller.transferProgress.connect(self.update_transfer_status)
         self.controller.downloadFinished.connect(self.on_download_finished)
+        self.controller.downloadCancelled.connect(self.on_download_cancelled)
+
+    def closeEvent(self, event):
+        self.controller.shutdown()
+        super().closeEvent(event)
 
     def on_search_clicked(self):
         query = self.search_input.text().strip()
         if not query:
             return
 
-        self.results_list.clear()
-        self.chapters_list.clear()
+        self.controller.result_model.set_items([])
+        self.controller.chapter_model.set_items([])
 
         if "comick.io/comic/" in query:
             # This regex is a bit more robust for identifying chapter URLs
             if re.search(r"/(c\d+|[\w-]+-chapter-[\w-]+)", query):
-                self.results_list.addItem(f"Directly downloading chapter from URL...")
+                self.status_bar.showMessage("Directly downloading chapter from URL...")
                 convert_to_pdf = self.pdf_checkbox.isChecked()
                 delete_images = self.delete_images_checkbox.isChecked()
+                self.set_download_running(True)
                 self.controller.download_single_chapter_from_url(query, self.output_dir, convert_to_pdf, delete_images)
             else:
-                self.results_list.addItem(f"Fetching chapters from URL...")
+                self.status_bar.showMessage("Fetching chapters from URL...")
                 self.controller.fetch_chapters_from_url(query)
         else:
-            self.results_list.addItem("Searching...")
+            self.status_bar.showMessage("Searching...")
             self.controller.start_search(query)
 
-    def on_manga_selected(self, item):
-        row = self.results_list.row(item)
-        self.chapters_list.clear()
-        self.chapters_list.addItem("Fetching chapters...")
-        self.controller.fetch_chapters(row)
+    def on_manga_selected(self, index):
+        self.status_bar.showMessage("Fetching chapters...")
+        self.controller.fetch_chapters(index.row())
 
     def on_select_dir_clicked(self):
         path = QFileDialog.getExistingDirectory(self, "Select Output Folder", self.output_dir)
@@ -135,62 +172,115 @@ class MangaDownloaderGUI(QWidget):
             self.output_dir_label.setText(f"Output: {self.output_dir}")
 
     def on_download_clicked(self):
-        selected_items = self.chapters_list.selectedItems()
-        if not selected_items:
+        selected_rows = self.chapters_list.selectionModel().selectedRows()
+        if not selected_rows:
             QMessageBox.warning(self, "No Chapters Selected", "Please select one or more chapters to download.")
             return
 
-        selected_indices = [self.chapters_list.row(item) for item in selected_items]
+        # Rows of the filtered view -> rows of the controller's chapter list
+        selected_indices = sorted(self.chapter_filter.mapToSource(index).row() for index in selected_rows)
         
         convert_to_pdf = self.pdf_checkbox.isChecked()
         delete_images = self.delete_images_checkbox.isChecked()
 
-        self.download_button.setEnabled(False)
+        self.set_download_running(True)
         self.status_bar.showMessage("Starting download...")
         self.controller.start_download(selected_indices, self.output_dir, convert_to_pdf, delete_images)
 
+    def set_download_running(self, running):
+        self.download_button.setEnabled(not running)
+        self.pause_button.setEnabled(running)
+        self.pause_button.setText("Pause")
+        self.stop_button.setEnabled(running)
+
+    def on_pause_clicked(self):
+        if self.pause_button.text() == "Pause":
+            self.controller.pause_download()
+            self.pause_button.setText("Resume")
+            self.status_bar.showMessage("Paused.")
+        else:
+            self.controller.resume_download()
+            self.pause_button.setText("Pause")
+            self.status_bar.showMessage("Resuming download...")
+
+    def on_stop_clicked(self):
+        self.controller.stop_download()
+        self.pause_button.setEnabled(False)
+        self.stop_button.setEnabled(False)
+        self.status_bar.showMessage("Stopping download...")
+
+    def prefetch_selected_chapters(self):
+        if not self.download_button.isEnabled():
+            return # A download is running
+        selection_model = self.chapters_list.selectionModel()
+        rows = [self.chapter_filter.mapToSource(index).row() for index in selection_model.selectedRows()]
+        # The chapter clicked last is the most likely one, then the newest of the rest
+        current = self.chapter_filter.mapToSource(selection_model.currentIndex()).row()
+        rows.sort(reverse=True)
+        if current in rows:
+            rows.remove(current)
+            rows.insert(0, current)
+        self.controller.prefetch_chapters(rows)
+
     def select_all_chapters(self):
-        for i in range(self.chapters_list.count()):
-            self.chapters_list.item(i).setSelected(True)
+        # One range covering every visible (filtered) row, instead of selecting rows one by one
+        row_count = self.chapter_filter.rowCount()
+        if row_count == 0:
+            return
+        selection = QItemSelection(self.chapter_filter.index(0, 0), self.chapter_filter.index(row_count - 1, 0))
+        self.chapters_list.selectionModel().select(selection, QItemSelectionModel.SelectionFlag.Select)
 
     def deselect_all_chapters(self):
-        for i in range(self.chapters_list.count()):
-            self.chapters_list.item(i).setSelected(False)
+        self.chapters_list.clearSelection()
 
     @pyqtSlot(int)
     def update_progress_bar(self, value):
         self.progress_bar.setValue(value)
         self.status_bar.showMessage(f"Downloading... {value}%")
 
+    @pyqtSlot(dict)
+    def update_transfer_status(self, snapshot):
+        if self.pause_button.text() == "Resume":
+            return # Keep showing "Paused."
+        self.status_bar.showMessage(f"Downloading... {self.progress_bar.value()}% • {format_transfer(snapshot)}")
+
     @pyqtSlot(str)
     def on_download_finished(self, output_dir):
         self.progress_bar.setValue(100)
         self.status_bar.showMessage("Download complete.")
-        self.download_button.setEnabled(True)
+        self.set_download_running(False)
         QMessageBox.information(self, "Download Complete", f"All selected chapters have been downloaded to:\n{output_dir}")
         self.progress_bar.setValue(0)
 
 
+    @pyqtSlot()
+    def on_download_cancelled(self):
+        self.set_download_running(False)
+        self.progress_bar.setValue(0)
+        self.status_bar.showMessage("Download stopped.")
+
     @pyqtSlot(list)
     def update_search_results(self, results):
-        self.results_list.clear()
+        # The view already shows the controller's result model
         if not results:
-            self.results_list.addItem("No results found.")
+            self.status_bar.showMessage("No results found.")
             return
-        for result in results:
-            self.results_list.addItem(result['title'])
+        self.status_bar.showMessage(f"Found {len(results)} results.")
         self.fade_in(self.results_list)
 
+    @pyqtSlot(list)
+    def on_chapters_page(self, chapters):
+        loaded = self.controller.chapter_model.rowCount()
+        if chapters and loaded == len(chapters):
+            self.fade_in(self.chapters_list) # First page of a new list
+        self.status_bar.showMessage(f"Fetching chapters... {loaded} loaded")
+
     @pyqtSlot(list)
     def update_chapter_list(self, chapters):
-        self.chapters_list.clear()
         if not chapters:
-            self.chapters_list.addItem("No chapters found.")
+            self.status_bar.showMessage("No chapters found.")
             return
-        for chapter in chapters:
-            item = QListWidgetItem(chapter['title'])
-            self.chapters_list.addItem(item)
-        self.fade_in(self.chapters_list)
+        self.status_bar.showMessage(f"Found {len(chapters)} chapters.")
 
     def fade_in(self, widget):
         self.opacity_effect = QGraphicsOpacityEffect(widget)
@@ -226,18 +316,18 @@ class MangaDownloaderGUI(QWidget):
             QPushButton:hover {
                 background-color: #c0392b;
             }
-            QListWidget {
+            QListView {
                 background-color: #34495e;
                 border: 1px solid #2c3e50;
                 border-radius: 4px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 8px;
             }
-            QListWidget::item:alternate {
+            QListView::item:alternate {
                 background-color: #2c3e50;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #e74c3c;
             }
             QLabel {
@@ -0,0 +1,62 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+class TitleListModel(QAbstractListModel):
+    """
+    List model over the controller's search results or chapters (dicts with
+    'title' and 'url'). Views only ask for the rows they draw, so a series
+    with thousands of chapters does not create one widget per row.
+    """
+    ItemRole = Qt.ItemDataRole.UserRole # The whole dict of a row
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.items):
+            return None
+        item = self.items[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return item['title']
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return item['url']
+        if role == self.ItemRole:
+            return item
+        return None
+
+    def set_items(self, items: list[dict]):
+        """Replaces all rows."""
+        self.beginResetModel()
+        self.items = list(items)
+        self.endResetModel()
+
+    def append_items(self, items: list[dict]):
+        """Adds rows at the end, e.g. as chapter pages arrive, without touching the existing rows."""
+        if not items:
+            return
+        first = len(self.items)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        self.items.extend(items)
+        self.endInsertRows()
+
+    def reorder_items(self, items: list[dict]):
+        """
+        Switches to a new order of the same rows (matched by URL), keeping the
+        selection and current row in views. Falls back to set_items() if the
+        rows differ.
+        """
+        old_rows = {item['url']: row for row, item in enumerate(self.items)}
+        if len(items) != len(self.items) or any(item['url'] not in old_rows for item in items):
+            self.set_items(items)
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        new_rows = {item['url']: row for row, item in enumerate(items)}
+        old_indexes = self.persistentIndexList()
+        new_indexes = [self.index(new_rows[self.items[index.row()]['url']], 0) for index in old_indexes]
+        self.items = list(items)
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
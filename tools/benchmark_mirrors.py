@@ -0,0 +1,122 @@
+# tools/benchmark_mirrors.py
+"""
+Checks the Downloader's image host selection against local stand-in mirrors.
+
+Starts HTTP/1.1 servers on localhost that serve the same generated PNG
+page: a slow one (where the chapter's image URLs point, as if the DOM named
+a slow CDN edge), a fast one, a flaky one that fails part of its requests
+and one that is down. The same chapter is then downloaded:
+
+  - direct:  every page from the host its URL names
+  - mirrors: the three servers configured as one IMAGE_MIRRORS group
+  - down:    as mirrors, but the host the URLs name refuses every request
+
+and the time taken, pages saved and requests each host received are shown.
+
+    python tools/benchmark_mirrors.py --pages 60 --slow 0.3 --fast 0.02 --flaky-errors 0.5
+
+Needs requests and Pillow.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmark_transport import make_page
+from core.downloader import Downloader
+from core.hosts import HostSelector
+from core.transport import RequestsTransport
+
+class _MirrorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.stats["requests"] += 1
+        time.sleep(server.latency)
+        if random.random() < server.error_rate:
+            server.stats["errors"] += 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(server.page)))
+        self.end_headers()
+        self.wfile.write(server.page)
+
+    def log_message(self, format, *args):
+        pass
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass # Host probes hang up after the response headers, which is expected
+
+def start_mirror(name: str, page: bytes, latency: float, error_rate: float = 0.0):
+    server = _QuietServer(("127.0.0.1", 0), _MirrorHandler)
+    server.daemon_threads = True
+    server.name, server.page, server.latency, server.error_rate = name, page, latency, error_rate
+    server.stats = {"requests": 0, "errors": 0}
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_case(name: str, servers: list, primary, mirrors: tuple, pages: int) -> dict:
+    for server in servers:
+        server.stats.update(requests=0, errors=0)
+    selector = HostSelector(mirrors=mirrors)
+    downloader = Downloader(transport=RequestsTransport(), hosts=selector, requeue_passes=0)
+    image_urls = [f"{primary.url}/chapter/{i}.png" for i in range(pages)]
+    output_dir = tempfile.mkdtemp(prefix="comick-mirrors-")
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()): # Downloader prints a line per page
+            saved = downloader.download_images(image_urls, output_dir, "benchmark", primary.url)
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        downloader.transport.close()
+    requests_per_host = ", ".join(f"{server.name} {server.stats['requests']}" for server in servers)
+    return {"name": name, "seconds": elapsed, "saved": len(saved), "pages": pages, "hosts": requests_per_host}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=60, help="Pages per chapter (default: 60).")
+    parser.add_argument("--size", type=int, default=100, help="Approximate page size in KB (default: 100).")
+    parser.add_argument("--slow", type=float, default=0.3, help="Response latency of the slow host, in seconds (default: 0.3).")
+    parser.add_argument("--fast", type=float, default=0.02, help="Response latency of the fast host, in seconds (default: 0.02).")
+    parser.add_argument("--flaky-errors", type=float, default=0.5, help="Share of requests the flaky host fails (default: 0.5).")
+    args = parser.parse_args()
+
+    page = make_page(args.size)
+    slow = start_mirror("slow", page, args.slow)
+    fast = start_mirror("fast", page, args.fast)
+    flaky = start_mirror("flaky", page, args.fast, args.flaky_errors)
+    down = start_mirror("down", page, 0.0, error_rate=1.0)
+    print(f"📄 {args.pages} pages of {len(page) / 1024:.0f} KB; slow {args.slow * 1000:.0f} ms, fast {args.fast * 1000:.0f} ms, flaky {args.fast * 1000:.0f} ms with {args.flaky_errors:.0%} errors")
+
+    cases = [
+        ("direct", [slow, fast, flaky], slow, ()),
+        ("mirrors", [slow, fast, flaky], slow, ((slow.url, fast.url, flaky.url),)),
+        ("down", [down, slow, fast, flaky], down, ((down.url, slow.url, fast.url, flaky.url),)),
+    ]
+    try:
+        print(f"{'case':<10}{'seconds':>9}{'pages':>9}   requests per host")
+        for name, servers, primary, mirrors in cases:
+            result = run_case(name, servers, primary, mirrors, args.pages)
+            print(f"{result['name']:<10}{result['seconds']:>9.2f}{result['saved']:>5}/{result['pages']:<3}   {result['hosts']}")
+    finally:
+        for server in (slow, fast, flaky, down):
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# tools/benchmark_scraper.py
+"""
+Times ComickScraper's fetch_chapter_list, fetch_image_urls and search_manga
+on recorded sessions, so changes to the scraper can be measured offline
+(and in CI) without the live site.
+
+Record a session once, against the live site:
+
+    python tools/benchmark_scraper.py --record recordings/sample \\
+        --manga https://comick.io/comic/some-series \\
+        --chapter https://comick.io/comic/some-series/abcd-chapter-1-en \\
+        --search "some series"
+
+then replay it as often as needed, with no network access:
+
+    python tools/benchmark_scraper.py --replay recordings/sample --manga ... --chapter ... --search ... --rounds 3
+
+Each scrape's best and mean time and its number of results are shown. The
+exit status is 1 if any replayed scrape found nothing, which usually means
+the scraper no longer understands the recorded pages.
+
+Needs the scraper's own dependencies (cloudscraper, playwright with
+Chromium, beautifulsoup4).
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.recording import SessionRecording
+from core.scraper import ComickScraper
+
+def time_scrape(scraper: ComickScraper, name: str, call, rounds: int) -> dict:
+    timings = []
+    found = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()): # The scraper logs every step
+                result = call(scraper)
+        except Exception as e:
+            print(f"❌ {name} failed: {e}", file=sys.stderr)
+            result = []
+        timings.append(time.perf_counter() - start)
+        found = len(result[0]) if isinstance(result, tuple) else len(result)
+    return {"name": name, "best": min(timings), "mean": sum(timings) / rounds, "found": found}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--record", metavar="DIR", help="Scrape the live site and record the session to DIR.")
+    mode.add_argument("--replay", metavar="DIR", help="Replay the session recorded in DIR.")
+    parser.add_argument("--manga", action="append", default=[], help="A manga URL to fetch the chapter list of (repeatable).")
+    parser.add_argument("--chapter", action="append", default=[], help="A chapter URL to fetch the image URLs of (repeatable).")
+    parser.add_argument("--search", action="append", default=[], help="A search query (repeatable).")
+    parser.add_argument("--rounds", type=int, default=1, help="Times each scrape is replayed (default: 1; recording always runs once).")
+    args = parser.parse_args()
+
+    if not (args.manga or args.chapter or args.search):
+        parser.error("give at least one --manga, --chapter or --search")
+
+    recording = SessionRecording(args.record or args.replay, replay=bool(args.replay))
+    rounds = args.rounds if args.replay else 1
+    scrapes = (
+        [(f"chapter list {url}", lambda scraper, url=url: scraper.fetch_chapter_list(url)) for url in args.manga]
+        + [(f"image urls {url}", lambda scraper, url=url: scraper.fetch_image_urls(url)) for url in args.chapter]
+        + [(f"search {query!r}", lambda scraper, query=query: scraper.search_manga(query)) for query in args.search]
+    )
+
+    scraper = ComickScraper(recording=recording)
+    results = [time_scrape(scraper, name, call, rounds) for name, call in scrapes]
+
+    print(f"{'scrape':<70}{'best s':>9}{'mean s':>9}{'found':>7}")
+    for result in results:
+        print(f"{result['name'][:69]:<70}{result['best']:>9.2f}{result['mean']:>9.2f}{result['found']:>7}")
+    if args.record:
+        print(f"📼 Recorded to {args.record}")
+    elif any(result["found"] == 0 for result in results):
+        print("❌ Some replayed scrapes found nothing.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
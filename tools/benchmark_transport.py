@@ -0,0 +1,204 @@
+# tools/benchmark_transport.py
+"""
+Compares the Downloader's HTTP transports against local stand-in image servers.
+
+Starts an HTTP/1.1 server and an HTTP/2 (h2c) server on localhost that serve
+generated PNG pages with a configurable response latency and a per-connection
+setup delay (standing in for the TCP + TLS handshakes to the real CDN), then
+downloads the same chapter through Downloader.download_images with:
+
+  - requests-unpooled: a new connection per page (requests.get)
+  - requests:          the pooled requests Session transport
+  - httpx-h2:          the HTTP/2 transport, multiplexing pages on one connection
+
+    python tools/benchmark_transport.py --pages 60 --size 300 --latency 0.05 --connect-delay 0.1
+
+Needs requests, Pillow and httpx[http2].
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.downloader import Downloader
+from core.transport import RequestsTransport, HttpxTransport, StreamedResponse
+
+def make_page(size_kb: int) -> bytes:
+    """A PNG of random pixels (which barely compresses) of roughly size_kb kilobytes."""
+    from PIL import Image
+    side = max(int((size_kb * 1024 / 3) ** 0.5), 1)
+    image = Image.frombytes("RGB", (side, side), os.urandom(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+class _Http1Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, like the CDN
+
+    def setup(self):
+        super().setup()
+        self.server.stats["connections"] += 1
+        time.sleep(self.server.connect_delay)
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(self.server.page)))
+        self.end_headers()
+        self.wfile.write(self.server.page)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_http1_server(page: bytes, latency: float, connect_delay: float):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Http1Handler)
+    server.daemon_threads = True
+    server.page, server.latency, server.connect_delay = page, latency, connect_delay
+    server.stats = {"connections": 0}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+class H2cServer:
+    """A minimal HTTP/2 server without TLS (prior knowledge), serving one page for every GET."""
+    def __init__(self, page: bytes, latency: float, connect_delay: float):
+        self.page, self.latency, self.connect_delay = page, latency, connect_delay
+        self.stats = {"connections": 0}
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self.sock.getsockname()[1]}"
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.stats["connections"] += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, sock):
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        time.sleep(self.connect_delay)
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        lock = threading.Condition() # Guards conn and the socket; notified when flow control windows open
+
+        def flush():
+            sock.sendall(conn.data_to_send())
+
+        def respond(stream_id):
+            time.sleep(self.latency)
+            with lock:
+                conn.send_headers(stream_id, [(":status", "200"), ("content-type", "image/png"), ("content-length", str(len(self.page)))])
+                flush()
+            sent = 0
+            while sent < len(self.page):
+                with lock:
+                    window = min(conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size)
+                    if window <= 0:
+                        lock.wait(timeout=1)
+                        continue
+                    chunk = self.page[sent:sent + window]
+                    conn.send_data(stream_id, chunk, end_stream=sent + len(chunk) == len(self.page))
+                    flush()
+                    sent += len(chunk)
+
+        with lock:
+            conn.initiate_connection()
+            flush()
+        try:
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                with lock:
+                    events = conn.receive_data(data)
+                    for event in events:
+                        if isinstance(event, h2.events.RequestReceived):
+                            threading.Thread(target=respond, args=(event.stream_id,), daemon=True).start()
+                        elif isinstance(event, h2.events.WindowUpdated):
+                            lock.notify_all()
+                    flush()
+                if any(isinstance(event, h2.events.ConnectionTerminated) for event in events):
+                    break
+        except OSError:
+            pass
+        finally:
+            sock.close()
+
+    def shutdown(self):
+        self.sock.close()
+
+class UnpooledRequestsTransport(RequestsTransport):
+    """The Downloader's behaviour before transports: a plain requests.get, so a new connection, per page."""
+    name = "requests-unpooled"
+
+    @contextlib.contextmanager
+    def stream(self, url, headers, timeout):
+        import requests
+        with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            yield StreamedResponse(response.status_code, response.headers, lambda chunk_size: response.iter_content(chunk_size=chunk_size))
+
+def run_case(transport, base_url: str, stats: dict, pages: int, rounds: int) -> dict:
+    downloader = Downloader(transport=transport)
+    image_urls = [f"{base_url}/page/{i}.png" for i in range(pages)]
+    stats["connections"] = 0
+    output_dir = tempfile.mkdtemp(prefix="comick-bench-")
+    timings = []
+    downloaded = 0
+    try:
+        for _ in range(rounds):
+            shutil.rmtree(output_dir, ignore_errors=True)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()): # Downloader prints a line per page
+                saved = downloader.download_images(image_urls, output_dir, "benchmark", base_url)
+            timings.append(time.perf_counter() - start)
+            downloaded += sum(os.path.getsize(path) for path in saved)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        transport.close()
+    total = sum(timings)
+    return {"name": transport.name, "best": min(timings), "mean": total / rounds, "mb_per_s": downloaded / total / 1e6, "connections": stats["connections"]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=60, help="Pages per chapter (default: 60).")
+    parser.add_argument("--size", type=int, default=300, help="Approximate page size in KB (default: 300).")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds before the server answers each request (default: 0.05).")
+    parser.add_argument("--connect-delay", type=float, default=0.1, help="Seconds added to every new connection, standing in for TCP + TLS setup (default: 0.1).")
+    parser.add_argument("--rounds", type=int, default=3, help="Times each chapter is downloaded (default: 3).")
+    args = parser.parse_args()
+
+    page = make_page(args.size)
+    print(f"📄 {args.pages} pages of {len(page) / 1024:.0f} KB, {args.latency * 1000:.0f} ms latency, {args.connect_delay * 1000:.0f} ms per new connection, {args.rounds} rounds")
+
+    http1_server, http1_url = start_http1_server(page, args.latency, args.connect_delay)
+    h2_server = H2cServer(page, args.latency, args.connect_delay)
+    cases = [
+        (UnpooledRequestsTransport(), http1_url, http1_server.stats),
+        (RequestsTransport(), http1_url, http1_server.stats),
+        (HttpxTransport(http1=False), h2_server.url, h2_server.stats),
+    ]
+    try:
+        print(f"{'transport':<20}{'best s':>9}{'mean s':>9}{'MB/s':>9}{'connections':>13}")
+        for transport, url, stats in cases:
+            result = run_case(transport, url, stats, args.pages, args.rounds)
+            print(f"{result['name']:<20}{result['best']:>9.2f}{result['mean']:>9.2f}{result['mb_per_s']:>9.1f}{result['connections']:>13}")
+    finally:
+        http1_server.shutdown()
+        h2_server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# tools/check_import_time.py
+"""
+Checks that the CLI starts without importing its heavy dependencies.
+
+Runs `python -X importtime cli/main.py --help` and imports what the
+`download` command loads to hand a job to a running daemon (or runs the
+CLI with the given arguments instead), and fails if any module in
+HEAVY_MODULES was imported. The import time is shown for information;
+it varies too much between machines to fail on, unless a budget is given.
+
+    python tools/check_import_time.py
+    python tools/check_import_time.py --budget-ms 600 -- download --help
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that only the commands doing real work should load
+HEAVY_MODULES = ("playwright", "cloudscraper", "bs4", "PIL", "requests", "httpx", "numpy", "pypdf", "PyQt6", "core.scraper", "core.downloader")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+# The modules `download` imports before it hands a job to a running daemon (see download_command)
+DAEMON_HANDOFF = "import cli.main, core.daemon"
+
+def measure(python_args: list[str]) -> list[tuple[int, int, str]]:
+    """Returns (cumulative microseconds, nesting level, module) for every import made by `python <python_args>`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *python_args], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit(f"❌ python {' '.join(python_args)} exited with code {result.returncode}.")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports.append((int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    return imports
+
+def check(name: str, python_args: list[str], budget_ms: float | None, top: int) -> bool:
+    """Prints the import times of one startup path and returns False if it imported a heavy module or went over budget."""
+    imports = measure(python_args)
+    top_level = [(micros, module) for micros, level, module in imports if level == 0]
+    total_ms = sum(micros for micros, _ in top_level) / 1000
+
+    budget = f" (budget {budget_ms:.0f} ms)" if budget_ms is not None else ""
+    print(f"⏱️ {name}: {len(imports)} modules imported in {total_ms:.0f} ms{budget}")
+    for micros, module in sorted(top_level, reverse=True)[:top]:
+        print(f"  {micros / 1000:8.1f} ms  {module}")
+
+    heavy = sorted({module for _, _, module in imports if module.split(".")[0] in HEAVY_MODULES or module in HEAVY_MODULES})
+    passed = True
+    if heavy:
+        print(f"❌ Heavy modules imported: {', '.join(heavy)}")
+        passed = False
+    if budget_ms is not None and total_ms > budget_ms:
+        print(f"❌ Import time {total_ms:.0f} ms is over the {budget_ms:.0f} ms budget.")
+        passed = False
+    return passed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Also fail if a check's total import time exceeds this many milliseconds (default: no limit).")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest top-level imports to show.")
+    parser.add_argument("cli_args", nargs="*", help="Arguments passed to cli/main.py (default: check --help and the download daemon handoff).")
+    args = parser.parse_args()
+
+    main_py = os.path.join(ROOT, "cli", "main.py")
+    if args.cli_args:
+        checks = [(f"cli/main.py {' '.join(args.cli_args)}", [main_py, *args.cli_args])]
+    else:
+        checks = [("cli/main.py --help", [main_py, "--help"]), ("download daemon handoff", ["-c", DAEMON_HANDOFF])]
+
+    results = [check(name, python_args, args.budget_ms, args.top) for name, python_args in checks]
+    if not all(results):
+        sys.exit(1)
+    print("✅ No heavy modules imported at startup.")
+
+if __name__ == "__main__":
+    main()
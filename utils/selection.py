@@ -0,0 +1,50 @@
+import re
+
+def get_comic_slug(url: str) -> str:
+    """Extracts the comic slug from the URL for the output directory name."""
+    match = re.search(r'/comic/([^/]+)', url)
+    return match.group(1) if match else "manga"
+
+def get_chapter_slug(url: str) -> str:
+    """Extracts the chapter part of a chapter URL (e.g. '1-en' from '.../chapter-1-en')."""
+    match = re.search(r'chapter-([^/]+)', url)
+    return match.group(1) if match else "chapter"
+
+def is_chapter_url(url: str) -> bool:
+    """Returns True if the URL points to a single chapter rather than a manga page."""
+    return "/comic/" in url and "chapter" in url
+
+def parse_chapter_selection(selection: str, max_chapters: int) -> list[int]:
+    """Parses a chapter selection string (e.g., '1,3-5,all')."""
+    if selection.lower() == 'all':
+        return list(range(1, max_chapters + 1))
+
+    indices = set()
+    parts = selection.split(',')
+    for part in parts:
+        part = part.strip()
+        if '-' in part:
+            start, end = map(int, part.split('-'))
+            indices.update(range(start, end + 1))
+        else:
+            indices.add(int(part))
+    return sorted(list(indices))
+
+def parse_batch_file(path: str) -> list[tuple[str, str | None]]:
+    """
+    Reads a batch file with one manga or chapter URL per line, optionally
+    followed by whitespace and a chapter selection (e.g. '1-5').
+    Blank lines and lines starting with '#' are ignored.
+
+    Returns:
+        A list of (url, selection) tuples; selection is None if not given.
+    """
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split(None, 1)
+            entries.append((parts[0], parts[1].strip() if len(parts) > 1 else None))
+    return entries